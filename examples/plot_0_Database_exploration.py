@@ -15,7 +15,8 @@ plot.rcParams["figure.dpi"] = 400
 # ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
 #
 # Below is an extract of the nodes locations and characteristics.
-resourcecode.data.get_grid_field()
+grid_field = resourcecode.data.get_grid_field()
+grid_field
 # %%
 # One can also obtain the location of the points where the full 2D spectral data is available using
 # `resourcecode.get_grid_spec()` function
@@ -38,35 +39,68 @@ selected_node
 lat_min, lat_max = 47.75, 48.75
 lon_min, lon_max = -5.25, -4.25
 
-nodes = resourcecode.data.get_grid_field().query(
-    f"latitude <= {lat_max} and latitude >= {lat_min} and longitude > {lon_min} and longitude < {lon_max}"
-)
-spec = resourcecode.get_grid_spec().query(
-    f"latitude <= {lat_max} and latitude >= {lat_min} and longitude > {lon_min} and longitude < {lon_max}"
-)
-coast = resourcecode.data.get_coastline().query(
-    f"latitude <= {lat_max} and latitude >= {lat_min} and longitude > {lon_min} and longitude < {lon_max}"
+
+def in_area(df):
+    """Select the rows of df located in the plotted area"""
+    latitude = df.latitude.to_numpy()
+    longitude = df.longitude.to_numpy()
+    return df[
+        (latitude <= lat_max)
+        & (latitude >= lat_min)
+        & (longitude > lon_min)
+        & (longitude < lon_max)
+    ]
+
+
+nodes = in_area(grid_field)
+spec = in_area(resourcecode.get_grid_spec())
+coast = in_area(resourcecode.data.get_coastline())
+islands = in_area(resourcecode.data.get_islands())
+
+# The islands contours are concatenated in a single line, separated by NaN, so
+# that they are all drawn at once.
+island_breaks = np.flatnonzero(np.diff(islands.ID.to_numpy())) + 1
+islands_lon = np.insert(islands.longitude.to_numpy(), island_breaks, np.nan)
+islands_lat = np.insert(islands.latitude.to_numpy(), island_breaks, np.nan)
+selected = nodes[nodes.node == selected_node[0]]
+
+
+def overlay(ax):
+    """Draw the coastlines, the islands and the selected point on ax"""
+    ax.plot(coast.longitude, coast.latitude, color="black")
+    ax.plot(islands_lon, islands_lat, color="black")
+    ax.scatter(
+        selected.longitude,
+        selected.latitude,
+        s=3,
+        color="red",
+        label="Selected point",
+    )
+
+
+plot.figure(figsize=(10, 10))
+# the nodes all share the same style: draw them as lines without segments,
+# which is much faster than a scatter plot for a dense mesh.
+plot.plot(
+    nodes.longitude.to_numpy(),
+    nodes.latitude.to_numpy(),
+    marker=".",
+    markersize=1,
+    linestyle="none",
+    label="Nodes",
 )
-islands = resourcecode.data.get_islands().query(
-    f"latitude <= {lat_max} and latitude >= {lat_min} and longitude > {lon_min} and longitude < {lon_max}"
+plot.plot(
+    spec.longitude.to_numpy(),
+    spec.latitude.to_numpy(),
+    marker=".",
+    markersize=1.5,
+    linestyle="none",
+    color="orange",
+    label="Spectral grid",
 )
-plot.figure(figsize=(10, 10))
-plot.scatter(nodes.longitude, nodes.latitude, s=1, label="Nodes")
-plot.scatter(spec.longitude, spec.latitude, s=2, color="orange", label="Spectral grid")
 plot.ylim(lat_min, lat_max)
 plot.xlim(lon_min, lon_max)
-plot.plot(coast.longitude, coast.latitude, color="black")
-classes = list(islands.ID.unique())
-for c in classes:
-    df2 = islands.loc[islands["ID"] == c]
-    plot.plot(df2.longitude, df2.latitude, color="black")
-plot.scatter(
-    nodes[nodes.node == selected_node[0]].longitude,
-    nodes[nodes.node == selected_node[0]].latitude,
-    s=3,
-    color="red",
-    label="Selected point",
-)
+overlay(plot.gca())
 plot.legend()
 plot.show()
 # %%
@@ -83,7 +117,7 @@ plot.show()
 tri = (
     resourcecode.get_triangles().to_numpy() - 1
 )  # The '-1' is due to the Zero-based numbering of python
-field_mesh = resourcecode.data.get_grid_field().to_numpy()
+field_mesh = grid_field.to_numpy()
 triang = mtri.Triangulation(field_mesh[:, 1], field_mesh[:, 2], tri)
 
 plotted_nodes = (
@@ -93,8 +127,8 @@ plotted_nodes = (
     & (field_mesh[:, 2] >= lat_min)
 )
 
-s = field_mesh[:, 3]
-s[np.isnan(s)] = 0  # Due to missing values in bathy
+s = np.ascontiguousarray(field_mesh[:, 3])
+np.nan_to_num(s, copy=False, nan=0.0)  # Due to missing values in bathy
 
 fig = plot.figure(figsize=(10, 10))
 
@@ -104,20 +138,8 @@ plot.ylim(lat_min, lat_max)
 plot.xlim(lon_min, lon_max)
 SC = ax0.tripcolor(triang, s, shading="gouraud")
 SC.set_clim(min(s[plotted_nodes]), max(s[plotted_nodes]))
-# Plot selected location
-plot.scatter(
-    nodes[nodes.node == selected_node[0]].longitude,
-    nodes[nodes.node == selected_node[0]].latitude,
-    s=3,
-    color="red",
-    label="Selected point",
-)
-# Add coastlines and islands
-plot.plot(coast.longitude, coast.latitude, color="black")
-classes = list(islands.ID.unique())
-for c in classes:
-    df2 = islands.loc[islands["ID"] == c]
-    plot.plot(df2.longitude, df2.latitude, color="black")
+# Add coastlines, islands and the selected location
+overlay(ax0)
 
 # Colorbar.
 the_divider = make_axes_locatable(ax0)
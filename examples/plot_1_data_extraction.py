@@ -3,6 +3,7 @@
 Extract some time-series from the database and analysis
 ==========================================================
 """
+import numpy as np
 import resourcecode
 import resourcecode.spectrum
 import matplotlib.pyplot as plot
@@ -43,7 +44,8 @@ selected_specPoint
 #  - The energy flux :math:`CgE`;
 #  - zonal and meridional velocity components of wind;
 #
-# For this example, we have selectedonly year 2010.
+# For this example, we have selectedonly year 2010. Single precision is
+# enough for this analysis, and halves the memory used by the data.
 
 client = resourcecode.Client()
 data = client.get_dataframe(
@@ -51,6 +53,7 @@ data = client.get_dataframe(
     startDateTime="2010-01-01T01:00:00",
     endDateTime="2011-01-01T00:00:00",
     parameters=("hs", "uwnd", "vwnd", "t02", "tp", "dp", "cge"),
+    dtype=np.float32,
 )
 data.head()
 
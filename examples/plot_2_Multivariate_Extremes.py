@@ -116,9 +116,10 @@ nataf = run_simulation(rho_nataf, quantile_fit, gpd_parameters, n_simulations=10
 # We first have to define the appropriate level set for the Huseby method.#
 # They are defined using the number of **joint** excess of :math:`H_s` and :math:`W_s`.
 
-npy = data.query(
-    f"hs>{models[0].extremes_kwargs['threshold']} and wspd>{models[1].extremes_kwargs['threshold']}"
-).shape[0] / (np.unique(data.index.year).size)
+npy = (
+    (data.hs > models[0].extremes_kwargs["threshold"])
+    & (data.wspd > models[1].extremes_kwargs["threshold"])
+).sum() / (np.unique(data.index.year).size)
 levels = 1 - 1 / (return_periods * npy)
 
 # %%
@@ -16,6 +16,8 @@ Use-case example of the Operational Planning module
 #     the Resourcecode Tools `web page <https://resourcecode.ifremer.fr/tools>`_.
 
 import calendar
+import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 import resourcecode
@@ -28,6 +30,25 @@ client = resourcecode.Client()
 percentiles = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
 MONTH_NAMES = list(calendar.month_name)
 
+
+def monthly_stats(results):
+    """Compute the mean, extrema and percentiles of each month (column) of
+    results, with all the percentiles computed at once."""
+    values = results.to_numpy(dtype=float)
+    return pd.DataFrame(
+        np.column_stack(
+            (
+                np.nanmean(values, axis=0),
+                np.nanmin(values, axis=0),
+                np.nanquantile(values, percentiles, axis=0).T,
+                np.nanmax(values, axis=0),
+            )
+        ),
+        index=results.columns,
+        columns=["mean", "min", *[f"{p:.0%}" for p in percentiles], "max"],
+    ).sort_index()
+
+
 # %%
 # Data extraction
 # ^^^^^^^^^^^^^^^
@@ -56,9 +77,9 @@ data = client.get_dataframe_from_url(
 # any constraint can be used, as soon as the data is available (e.g. wind or current speed, etc.).
 # We also need to define the length of the weather windows needed, defined in hours.
 
-criteria = "hs < 1.8 and tp < 9"
+criteria = (data.hs < 1.8) & (data.tp < 9)
 winlen = 3
-data_matching_criteria = data.query(criteria)
+data_matching_criteria = data[criteria]
 
 # %%
 # Computation of weather windows
@@ -69,12 +90,7 @@ data_matching_criteria = data.query(criteria)
 
 windetect = ww_calc(data_matching_criteria, winlen=winlen, concurrent_windows=False)
 results = wwmonstats(windetect)
-stats = (
-    results.describe(percentiles=percentiles)
-    .drop(["count", "std"])
-    .transpose()
-    .sort_index()
-)
+stats = monthly_stats(results)
 
 # %%
 # Plotting the monthly statistics
@@ -95,15 +111,18 @@ plt.show()
 # We can also produce interactive plots to facilitate the visualisation.
 
 fig = go.Figure()
-for colname in stats.columns:
-    fig.add_trace(
+month_labels = [MONTH_NAMES[i] for i in stats.index]
+fig.add_traces(
+    [
         go.Scatter(
-            x=[MONTH_NAMES[i] for i in stats.index],
+            x=month_labels,
             y=stats[colname],
             name=colname,
             legendgroup="by_month",
         )
-    )
+        for colname in stats.columns
+    ]
+)
 
 fig.update_xaxes(title_text="Month")
 fig.update_yaxes(title_text="Number of Weather Window")
@@ -130,9 +149,10 @@ fig
 # Operational criteria
 # --------------------
 
-criteria = "hs < 1.8 and tp < 9"
+criteria = (data.hs < 1.8) & (data.tp < 9)
 oplen = 12
 critical_operation = False
+data_matching_criteria = data[criteria]
 
 # %%
 # Computation of operation durations
@@ -142,26 +162,24 @@ critical_operation = False
 
 oplendetect = oplen_calc(data_matching_criteria, oplen, critical_operation)
 results = olmonstats(oplendetect)
-stats = (
-    results.describe(percentiles=percentiles)
-    .drop(["count", "std"])
-    .transpose()
-    .sort_index()
-)
+stats = monthly_stats(results)
 
 # %%
 # And finally produce visual exploration of the durations.
 
 fig = go.Figure()
-for colname in stats.columns:
-    fig.add_trace(
+month_labels = [MONTH_NAMES[i] for i in stats.index]
+fig.add_traces(
+    [
         go.Scatter(
-            x=[MONTH_NAMES[i] for i in stats.index],
+            x=month_labels,
             y=stats[colname],
             name=colname,
             legendgroup="by_month",
-        ),
-    )
+        )
+        for colname in stats.columns
+    ]
+)
 
 fig.update_xaxes(title_text="Month")
 fig.update_yaxes(title_text="Length of operations")
@@ -36,8 +36,8 @@ DATA_DIR = Path(producible_assessment.__file__).parent / "Inputs"
 capture_width = pd.read_csv(DATA_DIR / "capture_width.csv", delimiter=",", header=None)
 freq = pd.read_csv(DATA_DIR / "Frequencies.csv", delimiter=",", header=None)
 pto_data = pd.read_csv(DATA_DIR / "PTO_values.csv", delimiter=",", header=None)
-capture_width.columns = pto_data.values.tolist()[0]
-capture_width.index = [val for sublist in freq.values.tolist() for val in sublist]
+capture_width.columns = pto_data.iloc[0].to_numpy()
+capture_width.index = freq.to_numpy().ravel()
 
 # %%
 # Plot of the characteristics of the WEC
@@ -137,88 +137,61 @@ plt.tight_layout()
 # The plots below show the repartition of WEC power in the two cases considered and
 # the histogram of corresponding damping.
 
-fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(10, 10))
-# absorbed power
-power_kw = pto.power.div(1000)
-# cumulative power
-cumulative_power_kw = pto.cumulative_power
-power_ordered = pto.power.sort_values(by=0)
-index = [x / 1000 for x in power_ordered[0]]
-cumulative_power_kw.index = index
-# mean power
-mean_power_kw = pto.mean_power[0][pto.times[0]] / 1000
-# median power
-median_power_kw = pto.median_power[0][pto.times[0]] / 1000
-# power occurrences, cumulative power, mean and median power
-ax1 = power_kw.plot.hist(
-    ax=ax1,
-    bins=len(pto.capture_width.columns) * 5,
-    legend=False,
-    weights=np.ones_like(power_kw[power_kw.columns[0]]) * 100.0 / len(power_kw),
-)
-ax1b = ax1.twinx()
-cumulative_power_kw.plot(ax=ax1b, legend=False, color="r")
-ax1.grid()
-ax1.set_xlabel("WEC Power (kW)")
-ax1.set_ylabel("Occurrence (%)")
-ax1b.set_ylabel("Normed Cumulative Production (%)")
-line_mean = ax1.axvline(x=mean_power_kw, color="y")
-line_median = ax1.axvline(x=median_power_kw, color="orange")
-ax1.legend([line_mean, line_median], ["Mean power", "Median power"], loc="center right")
-
-# plot PTO histogram
-pto_damp_kn = pto.pto_damp / 1000
-pto_damp_kn.plot.hist(
-    ax=ax2,
-    bins=len(pto.capture_width.columns),
-    legend=False,
-    weights=np.ones_like(pto_damp_kn[pto_damp_kn.columns[0]])
-    * 100.0
-    / len(pto_damp_kn),
-)
-ax2.grid()
-ax2.set_xlabel("PTO damping (kN.s/m)")
-ax2.set_ylabel("Occurrence (%)")
-
-# absorbed power (JONWSAP)
-power_kw = pto_jonswap.power.div(1000)
-# cumulative power
-cumulative_power_kw = pto_jonswap.cumulative_power
-power_ordered = pto_jonswap.power.sort_values(by=0)
-index = [x / 1000 for x in power_ordered[0]]
-cumulative_power_kw.index = index
-# mean power
-mean_power_kw = pto_jonswap.mean_power[0][pto_jonswap.times[0]] / 1000
-# median power
-median_power_kw = pto_jonswap.median_power[0][pto_jonswap.times[0]] / 1000
-# power occurrences, cumulative power, mean and median power
-ax3 = power_kw.plot.hist(
-    ax=ax3,
-    bins=len(pto_jonswap.capture_width.columns) * 5,
-    legend=False,
-    weights=np.ones_like(power_kw[power_kw.columns[0]]) * 100.0 / len(power_kw),
+# The bins are shared between both cases, so that the histograms can be compared.
+
+power_bins = np.histogram_bin_edges(
+    np.concatenate((pto.power[0], pto_jonswap.power[0])) / 1000,
+    bins=len(capture_width.columns) * 5,
 )
-ax3b = ax3.twinx()
-cumulative_power_kw.plot(ax=ax3b, legend=False, color="r")
-ax3.grid()
-ax3.set_xlabel("WEC Power (kW)  - JONWSAP")
-ax3.set_ylabel("Occurrence (%)")
-ax3b.set_ylabel("Normed Cumulative Production (%)")
-line_mean = ax3.axvline(x=mean_power_kw, color="y")
-line_median = ax3.axvline(x=median_power_kw, color="orange")
-ax3.legend([line_mean, line_median], ["Mean power", "Median power"], loc="center right")
-
-# plot PTO histogram
-pto_damp_kn = pto_jonswap.pto_damp / 1000
-pto_damp_kn.plot.hist(
-    ax=ax4,
-    bins=len(pto.capture_width.columns),
-    legend=False,
-    weights=np.ones_like(pto_damp_kn[pto_damp_kn.columns[0]])
-    * 100.0
-    / len(pto_damp_kn),
+pto_damp_bins = np.histogram_bin_edges(
+    np.concatenate((pto.pto_damp[0], pto_jonswap.pto_damp[0])) / 1000,
+    bins=len(capture_width.columns),
 )
-ax4.grid()
-ax4.set_xlabel("PTO damping (kN.s/m) - JONWSAP")
-ax4.set_ylabel("Occurrence (%)")
+
+
+def plot_power_distribution(pto, ax_power, ax_pto_damp, suffix=""):
+    """Plot the occurrences of the absorbed power (with the cumulative power,
+    the mean and the median power) and the occurrences of the PTO damping"""
+    # absorbed power
+    power_kw = pto.power[0].to_numpy() / 1000
+    # cumulative power, as a function of the sorted absorbed power
+    cumulative_power = pto.cumulative_power[0].to_numpy()
+    power_ordered_kw = np.sort(power_kw)
+    # mean power
+    mean_power_kw = pto.mean_power[0].iloc[0] / 1000
+    # median power
+    median_power_kw = pto.median_power[0].iloc[0] / 1000
+    # power occurrences, cumulative power, mean and median power
+    ax_power.hist(
+        power_kw,
+        bins=power_bins,
+        weights=np.full(len(power_kw), 100.0 / len(power_kw)),
+    )
+    ax_cumulative = ax_power.twinx()
+    ax_cumulative.plot(power_ordered_kw, cumulative_power, color="r")
+    ax_power.grid()
+    ax_power.set_xlabel("WEC Power (kW)" + suffix)
+    ax_power.set_ylabel("Occurrence (%)")
+    ax_cumulative.set_ylabel("Normed Cumulative Production (%)")
+    line_mean = ax_power.axvline(x=mean_power_kw, color="y")
+    line_median = ax_power.axvline(x=median_power_kw, color="orange")
+    ax_power.legend(
+        [line_mean, line_median], ["Mean power", "Median power"], loc="center right"
+    )
+
+    # PTO damping histogram
+    pto_damp_kn = pto.pto_damp[0].to_numpy() / 1000
+    ax_pto_damp.hist(
+        pto_damp_kn,
+        bins=pto_damp_bins,
+        weights=np.full(len(pto_damp_kn), 100.0 / len(pto_damp_kn)),
+    )
+    ax_pto_damp.grid()
+    ax_pto_damp.set_xlabel("PTO damping (kN.s/m)" + suffix)
+    ax_pto_damp.set_ylabel("Occurrence (%)")
+
+
+fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(10, 10))
+plot_power_distribution(pto, ax1, ax2)
+plot_power_distribution(pto_jonswap, ax3, ax4, suffix=" - JONWSAP")
 plt.tight_layout()
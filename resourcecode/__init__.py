@@ -33,6 +33,7 @@ from resourcecode.data import (
     get_triangles,
     get_variables,
     get_closest_point,
+    get_closest_points,
     get_closest_station,
 )
 
@@ -56,4 +57,5 @@ __all__ = [
     "get_variables",
     "get_closest_station",
     "get_closest_point",
+    "get_closest_points",
 ]
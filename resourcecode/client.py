@@ -19,20 +19,64 @@
 # You should have received a copy of the GNU Lesser General Public License along
 # with Resourcecode. If not, see <https://www.gnu.org/licenses/>.
 
+import os
 import sys
 import json
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from itertools import chain
+from pathlib import Path
 from urllib.parse import urljoin, urlparse, parse_qs, unquote_plus
 from datetime import datetime
-from typing import Iterable, Union, Optional
+from typing import FrozenSet, Iterable, Union, Optional
 
 import requests
 import pandas as pd
 import numpy as np
+from numpy.typing import DTypeLike
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from resourcecode.utils import get_config
 from resourcecode.data import get_variables, get_grid_field
 from resourcecode.exceptions import BadParameterError, BadPointIdError
 
+# the maximum number of queries sent at the same time to the database
+MAX_CONCURRENT_QUERIES = 8
+
+
+def _to_timestamp(date: Optional[Union[str, datetime, int]]) -> Optional[int]:
+    """Convert a date to a timestamp in seconds.
+
+    The strings are parsed by pandas, so that any ISO 8601 date is accepted,
+    including the ones with a "Z" or an UTC offset. Like datetime.timestamp,
+    the naive dates are in local time.
+    """
+    if date is None:
+        return None
+    if isinstance(date, (int, np.integer)):
+        return int(date)
+    parsed: datetime
+    if isinstance(date, str):
+        parsed = pd.Timestamp(date).to_pydatetime()
+    else:
+        parsed = date
+    return int(parsed.timestamp())
+
+
+@lru_cache(maxsize=1)
+def _get_possible_parameters() -> FrozenSet[str]:
+    """Return the names of the variables available in the database"""
+    return frozenset(get_variables(columns=["name"]).name)
+
+
+@lru_cache(maxsize=1)
+def _get_possible_points_id() -> FrozenSet[int]:
+    """Return the ids of the nodes of the grid"""
+    return frozenset(get_grid_field(columns=["node"]).node.tolist())
+
 
 class Client:
     """Define a client to query data from the cassandra database
@@ -54,12 +98,45 @@ class Client:
         ...     parameters=["hs", "fp"],
         ... )
         >>>
+
+    Parameters
+    ----------
+
+    cache_dir: optional string or Path
+        a directory where the time series downloaded for a selection with an
+        end date are cached (one numpy file per parameter), so that they are
+        downloaded only once.
+        if not given, the `cache-dir` option of the configuration file is
+        used. If none is configured, nothing is cached.
     """
 
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None):
         self.config = get_config()
-        self.possible_parameters = set(get_variables().name)
-        self.possible_points_id = set(get_grid_field().node)
+
+        if cache_dir is None:
+            cache_dir = self.config.get("default", "cache-dir", fallback=None)
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+
+        # a single session keeps the connections to the database alive between
+        # the queries (one per parameter, possibly concurrent).
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=MAX_CONCURRENT_QUERIES,
+            pool_maxsize=MAX_CONCURRENT_QUERIES,
+            max_retries=Retry(
+                total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]
+            ),
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    @property
+    def possible_parameters(self) -> FrozenSet[str]:
+        return _get_possible_parameters()
+
+    @property
+    def possible_points_id(self) -> FrozenSet[int]:
+        return _get_possible_points_id()
 
     @property
     def cassandra_base_url(self):
@@ -71,6 +148,7 @@ class Client:
         startDateTime: Optional[Union[str, datetime, int]] = None,
         endDateTime: Optional[Union[str, datetime, int]] = None,
         parameters: Iterable[str] = ("hs",),
+        dtype: DTypeLike = np.float64,
     ) -> pd.DataFrame:
         """Get a pandas dataframe of the data described by the criteria
 
@@ -87,6 +165,9 @@ class Client:
             if not given, the most recent possible value will be used.
         parameters: list of string
             the parameters to retrieve
+        dtype: numpy dtype, default float64
+            the type of the returned values. `np.float32` halves the memory
+            used by the dataframe, which is enough for most analyses.
 
         Return
         ------
@@ -95,24 +176,14 @@ class Client:
         `endDateTime`, and with one column per parameter.
         """
 
-        if isinstance(startDateTime, str):
-            startDateTime = datetime.fromisoformat(startDateTime)
-        if isinstance(startDateTime, datetime):
-            startDateTime = int(startDateTime.timestamp())
-
-        if isinstance(endDateTime, str):
-            endDateTime = datetime.fromisoformat(endDateTime)
-        if isinstance(endDateTime, datetime):
-            endDateTime = int(endDateTime.timestamp())
-
         criteria = {
             "node": pointId,
-            "start": startDateTime,
-            "end": endDateTime,
+            "start": _to_timestamp(startDateTime),
+            "end": _to_timestamp(endDateTime),
             "parameters": parameters,
         }
 
-        return self.get_dataframe_from_criteria(criteria)
+        return self.get_dataframe_from_criteria(criteria, dtype=dtype)
 
     def get_dataframe_from_url(
         self, selection_url: str, parameters: Iterable[str] = ("hs",)
@@ -143,16 +214,16 @@ class Client:
         }
 
         if "startDateTime" in search_parameters:
-            start = search_parameters["startDateTime"][0].rstrip("Z")
-            criteria["start"] = int(datetime.fromisoformat(start).timestamp())
+            criteria["start"] = _to_timestamp(search_parameters["startDateTime"][0])
 
         if "endDateTime" in search_parameters:
-            end = search_parameters["endDateTime"][0].rstrip("Z")
-            criteria["end"] = int(datetime.fromisoformat(end).timestamp())
+            criteria["end"] = _to_timestamp(search_parameters["endDateTime"][0])
 
         return self.get_dataframe_from_criteria(criteria)
 
-    def get_dataframe_from_criteria(self, criteria: Union[str, dict]) -> pd.DataFrame:
+    def get_dataframe_from_criteria(
+        self, criteria: Union[str, dict], dtype: DTypeLike = np.float64
+    ) -> pd.DataFrame:
         """return the pandas dataframe of the data described by the criteria
 
         The criteria must be like this:
@@ -174,18 +245,22 @@ class Client:
         criteria: string (json) or dict
             a json-formatted string describing the criteria
             or the criteria as a dictionary
+        dtype: numpy dtype, default float64
+            the type of the returned values
 
         Return
         ------
         data: a Pandas DataFrame of the selected data
+
+        If the client has a `cache_dir` and the selection has an end date, the
+        time series already downloaded are read from the cache.
         """
 
         min_date = self.config.get("default", "min-start-date")
-        max_date = datetime.today().isoformat()
         default_criteria = {
             "node": 1,
-            "start": int(datetime.fromisoformat(min_date).timestamp()),
-            "end": int(datetime.fromisoformat(max_date).timestamp()),
+            "start": _to_timestamp(min_date),
+            "end": _to_timestamp(datetime.today()),
         }
 
         if isinstance(criteria, str):
@@ -193,6 +268,10 @@ class Client:
         else:
             parsed_criteria = criteria
 
+        # without an end date, the selection depends on the current date:
+        # there is no point in caching it.
+        use_cache = parsed_criteria.get("end") is not None
+
         # make sure compulsory parameters are present (node, dates) and are not
         # None.
         parsed_criteria = {**default_criteria, **parsed_criteria}
@@ -201,7 +280,6 @@ class Client:
             # let's tolerate `parameter` and `parameters`
             parsed_criteria["parameter"] = parsed_criteria["parameters"]
 
-        result_array = None
         parameters = parsed_criteria.get("parameter", ())
         unknown_parameters = set(parameters) - self.possible_parameters
         if unknown_parameters:
@@ -225,67 +303,175 @@ class Client:
                 )
 
         # Cassandra database start indexing at 1, so decrement node
-        parsed_criteria["node"] = parsed_criteria["node"] - 1
-
-        for parameter in parsed_criteria.get("parameter", ()):
-            # we assume that multiple parameters can be given.
-            # for each parameter, we make a query and we concatenate all the
-            # responses.
-
+        parsed_criteria["node"] = node_id - 1
+
+        # we assume that multiple parameters can be given.
+        # for each parameter of the database, we make a single query (even if
+        # it is needed by several requested parameters) and we concatenate
+        # all the responses.
+        single_parameters = {}
+        for parameter in parameters:
             # tp is not a real parameter. it is equal to 1/fp.
             single_parameter = parameter.lower()
             if parameter == "tp":
                 single_parameter = "fp"
-            single_parameter_criteria = {
+            single_parameters[parameter] = single_parameter
+        unique_parameters = list(dict.fromkeys(single_parameters.values()))
+
+        single_parameter_criteria = [
+            {
                 **parsed_criteria,
                 "parameter": [
                     single_parameter,
                 ],
             }
-            raw_data = self._get_rawdata_from_criteria(single_parameter_criteria)
-            # parameter_array is the time history of the current parameter.
-            # it's a 2D array. The first columns is the timestamp, the second
-            # one the value of this parameters at the corresponding timestamps.
-            parameter_array = np.array(raw_data["result"]["data"], dtype=float)
+            for single_parameter in unique_parameters
+        ]
+
+        get_parameter_array = partial(self._get_parameter_array, use_cache=use_cache)
+        if len(single_parameter_criteria) > 1:
+            # the queries are independent and mostly wait for the server: send
+            # them concurrently.
+            with ThreadPoolExecutor(
+                max_workers=min(MAX_CONCURRENT_QUERIES, len(unique_parameters))
+            ) as executor:
+                parameter_arrays = list(
+                    executor.map(get_parameter_array, single_parameter_criteria)
+                )
+        else:
+            parameter_arrays = [
+                get_parameter_array(single) for single in single_parameter_criteria
+            ]
+        arrays_by_parameter = dict(zip(unique_parameters, parameter_arrays))
+
+        # the values of each parameter are written in their column of
+        # result_array, allocated once the length of the time series is known.
+        # It is column-major, so that each column is contiguous, both here and
+        # in the block of the returned dataframe (no copy is made by pandas).
+        result_array = None
+        index_array = None
+        for column, parameter in enumerate(parameters):
+            parameter_array = arrays_by_parameter[single_parameters[parameter]]
+            if parameter_array is None:
+                print(
+                    "It appears the API failed to returned the expected values. "
+                    "You may try to recall the function in a few moment.",
+                    file=sys.stderr,
+                )
+                return pd.DataFrame()
+
+            values = parameter_array[:, 1]
+            if result_array is None:
+                result_array = np.empty(
+                    (len(values), len(parameters)), dtype=dtype, order="F"
+                )
             if parameter == "tp":
-                parameter_array[:, 1] = 1 / parameter_array[:, 1]
+                # the values of fp may also be returned: do not modify them
+                np.reciprocal(values, out=result_array[:, column])
+            else:
+                result_array[:, column] = values
 
-            try:
-                # concatenate and get ride of the timestamp (already known from
-                # the previous iteration)
-                result_array = np.column_stack((result_array, parameter_array[:, 1]))  # type: ignore
-            except ValueError:
-                result_array = parameter_array
+            if index_array is None:
                 index_array = parameter_array[:, 0]
-                mask_index_nan = np.isnan(index_array)
-            except Exception:
-                if raw_data["query"]["dataSetSize"] == 0:
-                    print(
-                        "It appears the API failed to returned the expected values. "
-                        "You may try to recall the function in a few moment.",
-                        file=sys.stderr,
-                    )
-                    return pd.DataFrame()
-                raise
-
-            # the index may be incomplete in some cases (when the variable is
-            # NaN).
-            # let's try to have the more complete index as possible, as the
-            # index should be the same for all the variable
-
-            if mask_index_nan.any():
-                index_array[mask_index_nan] = parameter_array[mask_index_nan, 0]
-                mask_index_nan = np.isnan(index_array)
-
-        if result_array is None:
+                missing_index = np.flatnonzero(np.isnan(index_array))
+            elif len(missing_index):
+                # the index may be incomplete in some cases (when the variable
+                # is NaN).
+                # let's try to have the more complete index as possible, as
+                # the index should be the same for all the variable
+                index_array[missing_index] = parameter_array[missing_index, 0]
+                missing_index = missing_index[np.isnan(index_array[missing_index])]
+
+        if index_array is None:
             raise ValueError("no selection parameter found")
 
+        # the timestamps are in milliseconds. They are converted in place to
+        # nanoseconds and viewed as datetime64, which is much faster than
+        # parsing them with pd.to_datetime. The missing timestamps are set to
+        # the minimum int64, which is NaT.
+        timestamps = index_array.astype(np.int64)
+        timestamps *= 1_000_000
+        timestamps[missing_index] = np.iinfo(np.int64).min
+        index = pd.DatetimeIndex(timestamps.view("datetime64[ns]"))
         return pd.DataFrame(
-            result_array[:, 1:],
+            result_array,
             columns=parsed_criteria["parameter"],
-            index=pd.to_datetime(index_array.astype(np.int64), unit="ms"),
+            index=index,
         )
 
+    def _get_parameter_array(
+        self, single_parameter_criteria: dict, use_cache: bool = True
+    ) -> Optional[np.ndarray]:
+        """return the time history of a single parameter
+
+        Parameters
+        ----------
+        single_parameter_criteria: dict
+            the dictionnary of parameters to give to cassandra
+        use_cache: bool
+            if False, the cache directory of the client is not used
+
+        Result
+        ------
+        parameter_array: 2D array or None
+            The first columns is the timestamp, the second one the value of
+            this parameters at the corresponding timestamps.
+            None if the database returned no data.
+        """
+        cache_path = None
+        if use_cache and self.cache_dir is not None:
+            # the clients of different databases must not share their data
+            selection = [self.cassandra_base_url] + [
+                single_parameter_criteria[name]
+                for name in ("node", "start", "end", "parameter")
+            ]
+            key = hashlib.blake2b(
+                json.dumps(selection, default=str).encode(), digest_size=16
+            ).hexdigest()
+            cache_path = self.cache_dir / f"{key}.npy"
+            if cache_path.exists():
+                try:
+                    return np.load(cache_path)
+                except (OSError, ValueError, EOFError):
+                    # an unreadable file is a cache miss: it is downloaded
+                    # again and replaced.
+                    pass
+
+        raw_data = self._get_rawdata_from_criteria(single_parameter_criteria)
+        data = raw_data["result"]["data"]
+        if not data and raw_data["query"]["dataSetSize"] == 0:
+            return None
+
+        # converting the flattened list is twice as fast as letting numpy
+        # discover the shape of the list of pairs.
+        parameter_array = np.array(
+            list(chain.from_iterable(data)), dtype=float
+        ).reshape(-1, 2)
+
+        if cache_path is not None:
+            self._write_cache(cache_path, parameter_array)
+        return parameter_array
+
+    @staticmethod
+    def _write_cache(cache_path: Path, parameter_array: np.ndarray) -> None:
+        """Write the array in the cache.
+
+        The array is written in a temporary file of the cache directory, then
+        moved to its final path, so that an interrupted write never leaves a
+        truncated file in the cache.
+        """
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=cache_path.parent, suffix=".tmp", delete=False
+        ) as tmp_file:
+            try:
+                np.save(tmp_file, parameter_array)
+            except BaseException:
+                tmp_file.close()
+                os.remove(tmp_file.name)
+                raise
+        os.replace(tmp_file.name, cache_path)
+
     def _get_rawdata_from_criteria(self, single_parameter_criteria):
         """return the json of the data described by the parameters
 
@@ -301,7 +487,7 @@ class Client:
         """
         query_url = urljoin(self.cassandra_base_url, "api/timeseries")
 
-        response = requests.get(query_url, single_parameter_criteria)
+        response = self._session.get(query_url, params=single_parameter_criteria)
         if response.ok:
             return response.json()
 
@@ -17,35 +17,59 @@
 # You should have received a copy of the GNU General Public License along
 # with Resourcecode. If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Tuple, Any
-from functools import partial
+from typing import TYPE_CHECKING, Callable, Optional, Sequence, Tuple
+from functools import lru_cache, partial
 from pathlib import Path
 
 import datetime
+import numpy as np
 import pandas as pd
+from numpy.typing import ArrayLike
 
-from resourcecode.utils import haversine
+from resourcecode.utils import EARTH_RADIUS_METER
+
+if TYPE_CHECKING:
+    from scipy.spatial import cKDTree
 
 DATA_DIR = Path(__file__).parent
 
-get_coastline = partial(pd.read_feather, DATA_DIR / "coastline.feather")
-get_grid_field = partial(pd.read_feather, DATA_DIR / "grid_FIELD.feather")
-get_grid_spec = partial(pd.read_feather, DATA_DIR / "grid_SPEC.feather")
-get_islands = partial(pd.read_feather, DATA_DIR / "islands.feather")
-get_triangles = partial(pd.read_feather, DATA_DIR / "triangles.feather")
-get_variables = partial(pd.read_feather, DATA_DIR / "variables.feather")
 
-# those parameters are from the feather.read_feather function
+@lru_cache(maxsize=None)
+def _read_feather(filename: str) -> pd.DataFrame:
+    """Read (once) a feather file of the data directory"""
+    return pd.read_feather(DATA_DIR / filename)
+
+
+def _read_data(
+    filename: str, columns: Optional[Sequence[str]] = None, **kwargs
+) -> pd.DataFrame:
+    if kwargs:
+        return pd.read_feather(DATA_DIR / filename, columns=columns, **kwargs)
+
+    # the cached dataframe is never returned as is: the caller may modify it.
+    dataset = _read_feather(filename)
+    if columns is None:
+        return dataset.copy()
+    return dataset[list(columns)].copy()
+
+
+get_coastline = partial(_read_data, "coastline.feather")
+get_grid_field = partial(_read_data, "grid_FIELD.feather")
+get_grid_spec = partial(_read_data, "grid_SPEC.feather")
+get_islands = partial(_read_data, "islands.feather")
+get_triangles = partial(_read_data, "triangles.feather")
+get_variables = partial(_read_data, "variables.feather")
+
+# the files are read once, and a copy of the data is returned on each call
 COMMON_PARAMETERS = """\
 Parameters
 ----------
 columns : sequence, optional
     Only read a specific set of columns. If not provided, all columns are
     read.
-use_threads: bool, default True
-    Whether to parallelize reading using multiple threads.
-memory_map : boolean, default True
-    Use memory mapping when opening file on disk
+**kwargs
+    Other parameters of pandas.read_feather (e.g. use_threads). If given,
+    the file is read again from the disk instead of the in-memory copy.
 
 Returns
 -------
@@ -102,18 +126,45 @@ The default returned columns are: name, longname, unit
 """
 
 
-def _get_closest(
-    dataset: pd.DataFrame, latitude: float, longitude: float, returned_attribute: str
-) -> Tuple[Any, float]:
-    distances = haversine(
-        dataset.latitude,
-        dataset.longitude,
-        latitude,
-        longitude,
+def _to_unit_sphere(latitude, longitude) -> np.ndarray:
+    """Convert positions in decimal degrees to cartesian coordinates on the
+    unit sphere."""
+    lat = np.radians(np.atleast_1d(latitude))
+    lon = np.radians(np.atleast_1d(longitude))
+    return np.column_stack(
+        (np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat))
     )
 
-    min_idx = distances.idxmin()
-    return dataset.loc[min_idx, returned_attribute], distances[min_idx].round(2)
+
+@lru_cache(maxsize=None)
+def _get_tree(
+    loader: Callable[..., pd.DataFrame], returned_attribute: str
+) -> Tuple["cKDTree", np.ndarray]:
+    """Build (once) the search tree of the nodes returned by the loader.
+
+    The nodes are placed on the unit sphere, so that the nearest node in
+    the euclidean sense is also the nearest along the great circle.
+    """
+    # scipy.spatial is slow to import, and only needed here
+    from scipy.spatial import cKDTree
+
+    dataset = loader(columns=["longitude", "latitude", returned_attribute])
+    tree = cKDTree(_to_unit_sphere(dataset.latitude, dataset.longitude))
+    return tree, dataset[returned_attribute].to_numpy()
+
+
+def _get_closest(
+    loader: Callable[..., pd.DataFrame],
+    latitude: ArrayLike,
+    longitude: ArrayLike,
+    returned_attribute: str,
+) -> Tuple[np.ndarray, np.ndarray]:
+    tree, attributes = _get_tree(loader, returned_attribute)
+    chord, idx = tree.query(_to_unit_sphere(latitude, longitude))
+
+    # convert the chord length to the great circle distance
+    distance = 2 * EARTH_RADIUS_METER * np.arcsin(np.minimum(chord / 2, 1.0))
+    return attributes[idx], np.round(distance, 2)
 
 
 def get_closest_point(latitude: float, longitude: float) -> Tuple[int, float]:
@@ -134,7 +185,31 @@ def get_closest_point(latitude: float, longitude: float) -> Tuple[int, float]:
         the corresponding point id, and its distance in meters, to the requested
         coordinates
     """
-    return _get_closest(get_grid_field(), latitude, longitude, "node")
+    closest, distance = _get_closest(get_grid_field, latitude, longitude, "node")
+    return closest[0], distance[0]
+
+
+def get_closest_points(
+    latitudes: ArrayLike, longitudes: ArrayLike
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the closest points in the mesh, from several positions at once
+
+    Parameters
+    ----------
+
+    latitudes
+        the latitudes in decimal degrees
+    longitudes
+        the longitudes in decimal degrees
+
+    Return
+    ------
+
+    (pointIds, distances)
+        two arrays with the point id closest to each requested position, and
+        its distance in meters
+    """
+    return _get_closest(get_grid_field, latitudes, longitudes, "node")
 
 
 def get_closest_station(latitude: float, longitude: float) -> Tuple[str, float]:
@@ -155,7 +230,8 @@ def get_closest_station(latitude: float, longitude: float) -> Tuple[str, float]:
         the corresponding station name, and its distance in meters, to the
         requested coordinates
     """
-    return _get_closest(get_grid_spec(), latitude, longitude, "name")
+    closest, distance = _get_closest(get_grid_spec, latitude, longitude, "name")
+    return closest[0], distance[0]
 
 
 def get_covered_period() -> dict:
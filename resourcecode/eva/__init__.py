@@ -24,6 +24,7 @@ from resourcecode.eva.censgaussfit import censgaussfit
 from resourcecode.eva.extrema import (
     get_fitted_models,
     get_gpd_parameters,
+    get_pot_extremes,
 )
 from resourcecode.eva.huseby import huseby
 from resourcecode.eva.simulation import run_simulation
@@ -32,6 +33,7 @@ __all__ = [
     "censgaussfit",
     "get_fitted_models",
     "get_gpd_parameters",
+    "get_pot_extremes",
     "huseby",
     "run_simulation",
 ]
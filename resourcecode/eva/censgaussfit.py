@@ -22,8 +22,6 @@ import numpy as np
 from scipy.stats import norm, mvn
 from scipy.optimize import minimize, Bounds, OptimizeResult
 
-from resourcecode.utils import set_trig
-
 
 def censgaussfit(data: np.ndarray, q: float) -> OptimizeResult:
     """Fit a censored Gaussian (Nataf) Copula to the data
@@ -48,35 +46,37 @@ def censgaussfit(data: np.ndarray, q: float) -> OptimizeResult:
     """
 
     quantiles = np.quantile(data, q, axis=0)
-    mask = np.ones(data.shape[0], dtype=bool)
-    for i in range(data.shape[1]):
-        mask = mask & (data[:, i] > quantiles[i])
+    mask = np.all(data > quantiles, axis=1)
 
-    tail_dependency_obs = sum(mask) / data.shape[0]
+    tail_dependency_obs = np.count_nonzero(mask) / data.shape[0]
     th_norm = norm.ppf(q)
 
+    # to get the same result as R, I needed to transpose
+    cov0 = np.corrcoef(data.T)[np.triu_indices(data.shape[1], k=1)]
+
+    # the arguments of mvnun are allocated once: only the correlations are
+    # updated when the fitness is evaluated by the optimizer.
+    dim = len(cov0)
+    upper_indices = np.triu_indices(dim, k=1)
+    sigma = np.eye(dim)
+    means = np.zeros(dim)
+    lower = np.full(dim, th_norm)
+    upper = np.full(dim, np.inf)
+
     def fitness(cov):
         # For the 2D case, we have only one parameter
-        if len(cov) > 1:
-            sigma = np.eye(len(cov))
-            set_trig(sigma, cov, "upper")
-            set_trig(sigma, cov, "lower")
+        if dim > 1:
+            sigma[upper_indices] = cov
+            sigma.T[upper_indices] = cov
+            covar = sigma
         else:
-            sigma = cov
+            covar = cov
 
         return (
             tail_dependency_obs
-            - mvn.mvnun(
-                means=np.zeros_like(cov),
-                covar=sigma,
-                lower=np.full(len(cov), th_norm),
-                upper=np.full(len(cov), np.inf),
-            )[0]
+            - mvn.mvnun(means=means, covar=covar, lower=lower, upper=upper)[0]
         ) ** 2
 
-    # to get the same result as R, I needed to transpose
-    cov0 = np.corrcoef(data.T)[np.triu_indices(data.shape[1], k=1)]
-
     return minimize(
         fitness,
         cov0,
@@ -18,6 +18,8 @@
 # You should have received a copy of the GNU General Public License along
 # with Resourcecode. If not, see <https://www.gnu.org/licenses/>.
 
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from typing import Union, List, Collection
 
 import numpy as np
@@ -25,32 +27,124 @@ import pandas as pd
 from pyextremes import EVA
 
 
+def get_pot_extremes(
+    serie: pd.Series,
+    threshold: float,
+    r: Union[str, pd.Timedelta] = "0",
+) -> pd.Series:
+    """Get the declustered exceedances of a time series above a threshold.
+
+    The exceedances separated by gaps longer than `r` belong to different
+    clusters, and only the maximum of each cluster is kept. The result is the
+    same as the one of the "POT" method of pyextremes, but the clusters are
+    found in a single pass over the data.
+
+    Parameters
+    ----------
+    serie: pd.Series
+        the time series, with a datetime index
+    threshold: float
+        the threshold used to find the exceedances
+    r: str or pd.Timedelta
+        the duration of the window used to decluster the exceedances
+
+    Returns
+    -------
+    extremes: pd.Series
+        the maximum of each cluster, indexed by its date
+    """
+    values = serie.to_numpy(dtype=np.float64)
+    exceedances = np.flatnonzero(values > threshold)
+    times = serie.index[exceedances]
+
+    # a new cluster starts after each gap longer than r
+    cluster_starts = np.flatnonzero(np.diff(times) > pd.to_timedelta(r)) + 1
+    cluster_starts = np.concatenate(([0], cluster_starts))[: len(exceedances)]
+    cluster_id = np.zeros(len(exceedances), dtype=np.int64)
+    cluster_id[cluster_starts[1:]] = 1
+    cluster_id = np.cumsum(cluster_id)
+
+    # keep the first occurrence of the maximum of each cluster
+    exceedance_values = values[exceedances]
+    cluster_max = np.maximum.reduceat(exceedance_values, cluster_starts)
+    is_max = np.flatnonzero(exceedance_values == cluster_max[cluster_id])
+    _, first_max = np.unique(cluster_id[is_max], return_index=True)
+    extremes = exceedances[is_max[first_max]]
+
+    return pd.Series(
+        values[extremes],
+        index=pd.Index(serie.index[extremes], name=serie.index.name or "date-time"),
+        dtype=np.float64,
+        name=serie.name,
+    )
+
+
+def _fit_model(serie: pd.Series, threshold: float, r: Union[str, pd.Timedelta]) -> EVA:
+    """Fit a GPD model to the exceedances of the serie above the threshold"""
+    model = EVA(serie)
+    if pd.to_timedelta(r) > pd.Timedelta(0):
+        model.set_extremes(
+            get_pot_extremes(model.data, threshold, r),
+            method="POT",
+            extremes_type="high",
+            threshold=threshold,
+            r=r,
+        )
+    else:
+        # pyextremes does not accept to set extremes without declustering
+        model.get_extremes(method="POT", threshold=threshold, r=r)
+    model.fit_model()
+    return model
+
+
 def get_fitted_models(
     dataframe: pd.DataFrame,
     quantile: float = 0.9,
     r: Union[str, pd.Timedelta] = "0",
+    max_workers: int = 1,
 ) -> List[EVA]:
-    models = []
-    for var_name, serie in dataframe.items():
-        threshold = serie.quantile(quantile)
-        model = EVA(serie)
-        model.get_extremes(method="POT", threshold=threshold, r=r)
-        model.fit_model()
-        models.append(model)
-    return models
+    """Fit a GPD model to each variable of the dataframe
 
+    Parameters
+    ----------
+    dataframe: pd.DataFrame
+        the time series of the variables, with a datetime index
+    quantile: float
+        the quantile of each variable used as the threshold of the exceedances
+    r: str or pd.Timedelta
+        the duration of the window used to decluster the exceedances
+    max_workers: int
+        if greater than 1, the variables are fitted in parallel, in that many
+        processes. On platforms where the processes are spawned, the calling
+        script must be guarded by ``if __name__ == "__main__":``.
 
-def get_gpd_parameters(fitted_models: Collection[EVA]) -> np.ndarray:
-    gpd_param = np.zeros((len(fitted_models), 3))
-
-    for index, model in enumerate(fitted_models):
-        threshold = model.extremes_kwargs["threshold"]
-        scale = model.model.fit_parameters["scale"]
+    Returns
+    -------
+    models: a list of the fitted pyextremes.EVA models, in the order of the
+        columns of the dataframe
+    """
+    series = [serie for _, serie in dataframe.items()]
+    # the thresholds of all the variables, in a single call
+    thresholds = dataframe.quantile(quantile).to_list()
+    if max_workers > 1 and len(series) > 1:
+        # the fits are CPU bound (mostly python code): they need processes
+        # to run in parallel.
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(series))) as executor:
+            return list(executor.map(_fit_model, series, thresholds, repeat(r)))
+    return [
+        _fit_model(serie, threshold, r) for serie, threshold in zip(series, thresholds)
+    ]
 
-        # pyextremes will try to find the best model.
-        # when 'c' is not specified, it means that 'c' has been fixed to 0.
-        shape = model.model.fit_parameters.get("c", 0)
 
-        gpd_param[index, :] = [threshold, scale, shape]
-
-    return gpd_param
+def get_gpd_parameters(fitted_models: Collection[EVA]) -> np.ndarray:
+    # pyextremes will try to find the best model.
+    # when 'c' is not specified, it means that 'c' has been fixed to 0.
+    gpd_param = [
+        (
+            model.extremes_kwargs["threshold"],
+            model.model.fit_parameters["scale"],
+            model.model.fit_parameters.get("c", 0),
+        )
+        for model in fitted_models
+    ]
+    return np.array(gpd_param, dtype=np.float64).reshape(-1, 3)
@@ -18,10 +18,100 @@
 # You should have received a copy of the GNU General Public License along
 # with Resourcecode. If not, see <https://www.gnu.org/licenses/>.
 
-from itertools import product
-
 import numpy as np
 
+from resourcecode.utils import get_num_threads, njit, prange
+
+
+@njit(parallel=True, cache=True)
+def _parallel_directional_quantiles(
+    X: np.ndarray,
+    directions: np.ndarray,
+    kth: np.ndarray,
+    kf: np.ndarray,
+    kc: np.ndarray,
+    dk: np.ndarray,
+) -> np.ndarray:
+    """Compiled version of `_directional_quantiles`, the directions being
+    processed in parallel by the threads of numba."""
+    C = np.empty((directions.shape[0], len(dk)))
+    for i in prange(directions.shape[0]):
+        Y = np.partition(X @ directions[i], kth)
+        C[i, :] = (Y[kc] - Y[kf]) * dk + Y[kf]
+    return C
+
+
+def _directional_quantiles(
+    X: np.ndarray,
+    directions: np.ndarray,
+    kf: np.ndarray,
+    kc: np.ndarray,
+    dk: np.ndarray,
+) -> np.ndarray:
+    """Compute the quantiles of the projection of X on each direction.
+
+    The quantiles are interpolated between the order statistics kf and kc,
+    with the weights dk. The directions are processed in parallel when numba
+    is installed and has more than two threads.
+
+    Parameters
+    ----------
+
+    X: a numpy array of size [NxM], the normalised simulations
+    directions: a numpy array of size [DxM], the unit vectors of the directions
+    kf, kc: integer arrays of size P, the order statistics surrounding the
+            quantiles
+    dk: a numpy array of size P, the interpolation weights
+
+    Returns
+    -------
+
+    C: a numpy array of size [DxP]
+    """
+    # only the order statistics kf and kc are needed: a partition is enough
+    kth = np.unique(np.concatenate((kf, kc)))
+
+    # np.partition is about twice slower in numba than in numpy: the compiled
+    # kernel only pays off when it runs on more than two threads.
+    if get_num_threads() > 2:
+        return _parallel_directional_quantiles(X, directions, kth, kf, kc, dk)
+
+    C = np.empty((directions.shape[0], len(dk)))
+    for i, direction in enumerate(directions):
+        Y = np.partition(X @ direction, kth)
+        C[i, :] = (Y[kc] - Y[kf]) * dk + Y[kf]
+    return C
+
+
+def _min_ratio(C: np.ndarray, ps: np.ndarray, block_size: int = 2**16) -> np.ndarray:
+    """Compute the minimum over j of C[j] / ps[i, j], for each direction i.
+
+    The ratios are computed by blocks of directions, so that the [DxD] array
+    of all the ratios is never built.
+
+    Parameters
+    ----------
+
+    C: a numpy array of size [DxP], the quantiles in each direction
+    ps: a numpy array of size [DxD], the clamped scalar products of the
+        directions
+    block_size: the approximate number of ratios computed at once
+
+    Returns
+    -------
+
+    dmin: a numpy array of size [DxP]
+    """
+    ndir, nprob = C.shape
+    dmin = np.empty((ndir, nprob))
+    quantiles = np.ascontiguousarray(C.T)
+    step = max(1, block_size // ndir)
+    for start in range(0, ndir, step):
+        block = slice(start, start + step)
+        for iprob in range(nprob):
+            dmin[block, iprob] = (quantiles[iprob] / ps[block]).min(axis=1)
+    return dmin
+
 
 def huseby(X: np.ndarray, prob: np.ndarray, ntheta: int):
     """Compute the contours of X in the physical space.
@@ -59,7 +149,7 @@ def huseby(X: np.ndarray, prob: np.ndarray, ntheta: int):
 
     Q = (X.T @ X) / (N - 1)
     L = np.linalg.cholesky(Q).T  # use .T as R returned the transposed.
-    X = np.linalg.solve(L.T, X.T).T
+    X = np.ascontiguousarray(np.linalg.solve(L.T, X.T).T)
 
     # quantiles calculation
     k = N * prob + 0.5
@@ -73,11 +163,7 @@ def huseby(X: np.ndarray, prob: np.ndarray, ntheta: int):
     stheta = np.sin(theta)
 
     if M == 2:
-        C = np.ones((ntheta, len(prob)), dtype=float)
-        for i in range(ntheta):
-            Y = X @ np.array([ctheta[i], stheta[i]])
-            Y.sort()
-            C[i, :] = (Y[kc] - Y[kf]) * dk + Y[kf]
+        C = _directional_quantiles(X, np.column_stack((ctheta, stheta)), kf, kc, dk)
 
         ps = (
             ctheta[:, np.newaxis] @ ctheta[:, np.newaxis].T
@@ -85,8 +171,7 @@ def huseby(X: np.ndarray, prob: np.ndarray, ntheta: int):
         )
         ps[ps < 0] = 0
 
-        for iprob in range(len(prob)):
-            C[:, iprob] = (C[:, iprob] / ps).min(axis=1)
+        C = _min_ratio(C, ps)
 
         Xres = ctheta[:, np.newaxis] * C
         Yres = stheta[:, np.newaxis] * C
@@ -98,73 +183,36 @@ def huseby(X: np.ndarray, prob: np.ndarray, ntheta: int):
         return Xres, Yres, theta
 
     if M == 3:
-        C = np.ones((ntheta, ntheta, len(prob)), dtype=float)
         indj = np.hstack(
             (np.arange(0, ntheta / 4 + 1), ntheta - np.arange(1, ntheta / 4 + 1))
         ).astype(int)
-        nindj = ntheta / 2 + 1
-        ncdir = int(ntheta * nindj)
-        cdir = np.zeros((ncdir, M))
-        Xres = np.empty((ncdir, M))
-        Yres = np.empty((ncdir, M))
-        Zres = np.empty((ncdir, M))
-
-        for icdir, (i, j) in enumerate(product(range(ntheta), indj)):
-            cdirc = np.array([ctheta[i] * ctheta[j], stheta[j], stheta[i] * ctheta[j]])
-            cdir[icdir, :] = cdirc
-            Y = X @ cdirc
-            Y.sort()
-            C[i, j, :] = (Y[kc] - Y[kf]) * dk + Y[kf]
+        nindj = len(indj)
+        ncdir = ntheta * nindj
+
+        # directions for all the (i, j) in product(range(ntheta), indj)
+        i, j = (a.ravel() for a in np.meshgrid(np.arange(ntheta), indj, indexing="ij"))
+        cdir = np.empty((ncdir, M))
+        cdir[:, 0] = ctheta[i] * ctheta[j]
+        cdir[:, 1] = stheta[j]
+        cdir[:, 2] = stheta[i] * ctheta[j]
+        C = _directional_quantiles(X, cdir, kf, kc, dk)
 
         ps = cdir @ cdir.T
         ps[ps < 0] = 0
 
-        a = np.arange(ntheta / 4 + 1, ntheta - ntheta / 4).astype(int)
-        b = np.hstack((np.arange(ntheta / 2, ntheta), np.arange(0, ntheta / 2))).astype(
-            int
-        )
-        c = np.hstack(
-            (np.arange(ntheta / 4 - 1, -1, -1), ntheta - np.arange(1, ntheta / 4))
-        ).astype(int)
-        d = ctheta[:, np.newaxis] @ ctheta[np.newaxis, indj]
-        e = np.repeat(stheta[indj], ntheta).reshape((-1, ntheta)).T
-        f = stheta[:, np.newaxis] @ ctheta[np.newaxis, indj]
-
-        for iprob in range(len(prob)):
-            tmp = C[:, indj, iprob].flatten()
-            dmin = (tmp / ps).min(axis=1).reshape((-1, len(indj))).T
-
-            # XXX how optimize this loop ?
-            for i, index in enumerate(indj):
-                C[:, index, iprob] = dmin[i]
-
-            C[:, a, iprob] = C[:, c, iprob][b]
-
-            tmp = d * C[:, indj, iprob]
+        # the contours for all the probabilities at once, ordered by (j, i)
+        dmin = _min_ratio(C, ps).reshape((ntheta, nindj, len(prob)))
+        contours = cdir.T.reshape((M, ntheta, nindj, 1)) * dmin
+        Xres, Yres, Zres = contours.transpose((0, 2, 1, 3)).reshape((M, ncdir, -1))
 
-            Xres[:, iprob] = tmp.T.flat
-
-            tmp = e * C[:, indj, iprob]
-            Yres[:, iprob] = tmp.T.flat
-
-            tmp = f * C[:, indj, iprob]
-            Zres[:, iprob] = tmp.T.flat
-
-            # Scaling back
-
-            Zres[:, iprob] = (
-                L[0, 2] * X_std[2] * Xres[:, iprob]
-                + L[1, 2] * X_std[2] * Yres[:, iprob]
-                + L[2, 2] * X_std[2] * Zres[:, iprob]
-                + X_mean[2]
-            )
-
-            Yres[:, iprob] = (
-                L[0, 1] * X_std[1] * Xres[:, iprob]
-                + L[1, 1] * X_std[1] * Yres[:, iprob]
-                + X_mean[1]
-            )
-
-            Xres[:, iprob] = L[0, 0] * X_std[0] * Xres[:, iprob] + X_mean[0]
+        # Scaling back
+        Zres = (
+            L[0, 2] * X_std[2] * Xres
+            + L[1, 2] * X_std[2] * Yres
+            + L[2, 2] * X_std[2] * Zres
+            + X_mean[2]
+        )
+        Yres = L[0, 1] * X_std[1] * Xres + L[1, 1] * X_std[1] * Yres + X_mean[1]
+        Xres = L[0, 0] * X_std[0] * Xres + X_mean[0]
 
         return Xres, Yres, Zres, theta
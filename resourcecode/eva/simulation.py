@@ -18,10 +18,12 @@
 # You should have received a copy of the GNU General Public License along
 # with Resourcecode. If not, see <https://www.gnu.org/licenses/>.
 
+from types import ModuleType
+from typing import Union
+
 import numpy as np
 
-# from numpy.random import multivariate_normal
-from scipy.stats import norm, genpareto, multivariate_normal
+from scipy.stats import norm, genpareto
 
 from resourcecode.utils import set_trig
 
@@ -31,6 +33,8 @@ def run_simulation(
     quantile: float,
     gpd_parameters: np.ndarray,
     n_simulations: int = 1000,
+    chunk_size: int = 1 << 18,
+    random_state: Union[None, int, np.random.Generator] = None,
 ) -> np.ndarray:
     """Run simulations from a fitted Nataf Model.
 
@@ -47,6 +51,13 @@ def run_simulation(
         output of the get_gpd_parameters.
     n_simulations: int
         the requested number of simulations
+    chunk_size: int
+        the maximum number of gaussian samples drawn at once. The accepted
+        samples are written in the result as they come, so the memory used
+        does not depend on the acceptance rate.
+    random_state: None, int or np.random.Generator
+        the seed or generator used to draw the samples. If None, the global
+        numpy random state is used.
 
 
     Returns
@@ -67,29 +78,56 @@ def run_simulation(
         sigma[1, 0] = rho
         sigma[0, 1] = rho
 
-    result = None
-    while result is None or len(result) < n_simulations:
-        simul = multivariate_normal.rvs(
-            mean=np.full(nvar, 0),
-            cov=sigma,
-            size=n_simulations,
-        )
-
-        mask = simul[:, 0] > norm.ppf(quantile)
+    # a single generator is shared between the chunks
+    rng: Union[np.random.Generator, ModuleType]
+    if random_state is None:
+        # the functions of np.random use the global numpy random state, so
+        # that np.random.seed applies
+        rng = np.random
+    else:
+        # any integer seed (including numpy integers) or a Generator
+        rng = np.random.default_rng(random_state)
+
+    # the correlated samples are drawn as A @ z, with z independent standard
+    # normal samples and A @ A.T = sigma. A is computed once, from the
+    # eigendecomposition of sigma, which (unlike a Cholesky factorisation)
+    # also accepts fully correlated variables.
+    eigenvalues, eigenvectors = np.linalg.eigh(sigma)
+    factor_t = (eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))).T
+
+    # the number of samples drawn is adapted to the acceptance rate estimated
+    # from the previous draws, starting from its upper bound (1 - quantile,
+    # reached when the variables are fully correlated).
+    threshold = norm.ppf(quantile)
+    acceptance = 1 - quantile
+    n_drawn = n_accepted = 0
+
+    # the accepted gaussian samples, transformed to the GPD margins at the end
+    samples = np.empty((n_simulations, nvar))
+    n_filled = 0
+    while n_filled < n_simulations:
+        size = min(chunk_size, int(1.2 * (n_simulations - n_filled) / acceptance) + 1)
+        simul = rng.standard_normal((size, nvar)) @ factor_t
+
+        mask = simul[:, 0] > threshold
         for i in range(1, nvar):
-            mask = mask & (simul[:, i] > norm.ppf(quantile))
-
-        simul = simul[mask]
-        simul = genpareto.ppf(
-            norm.cdf(simul - quantile),
-            loc=gpd_parameters[:, 0],
-            scale=gpd_parameters[:, 1],
-            c=gpd_parameters[:, 2],
-        )
-
-        if result is None:
-            result = simul
-        else:
-            result = np.vstack((result, simul))
-
-    return result[:n_simulations, :]
+            mask &= simul[:, i] > threshold
+        n_drawn += size
+        n_accepted += np.count_nonzero(mask)
+        acceptance = max(n_accepted, 1) / n_drawn
+
+        simul = simul[mask][: n_simulations - n_filled]
+        samples[n_filled : n_filled + len(simul)] = simul
+        n_filled += len(simul)
+
+    # the accepted samples follow the gaussian distribution conditioned to
+    # exceed the threshold: their probability to be exceeded given that they
+    # are above the threshold, sf(z) / (1 - quantile), is mapped onto the GPD
+    # margins, which model the exceedances above the GPD thresholds.
+    exceedance_probability = np.minimum(norm.sf(samples) / (1 - quantile), 1)
+    return genpareto.isf(
+        exceedance_probability,
+        loc=gpd_parameters[:, 0],
+        scale=gpd_parameters[:, 1],
+        c=gpd_parameters[:, 2],
+    )
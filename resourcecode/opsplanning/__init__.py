@@ -43,8 +43,8 @@ conditions meet the criteria
 
 The module, in order of execution to produce a full result, consists of:
 
-1. Use a pandas query to limit the dataset to the timestamps matching
-   operational criteria (`data.query("hs < 2 and tp < 3")` for instance)
+1. Use a boolean mask to limit the dataset to the timestamps matching
+   operational criteria (`data[(data.hs < 2) & (data.tp < 3)]` for instance)
 2. ww_calc - method to identify the weather windows
 3. oplen_calc - method to calculate operational length
 4. wwmonstats - method that produces monthly statistics of number of
@@ -56,12 +56,13 @@ Created on Wed Dec  2 14:14:48 2020
 
 @author: david.darbinyan
 """
-from itertools import product
 
 import pandas as pd
 import datetime as dt
 import numpy as np
 
+from resourcecode.opsplanning._kernels import _ww_scan, _oplen_scan
+
 
 def _get_timestep(data: pd.DataFrame) -> pd.Timedelta:
     """
@@ -119,27 +120,33 @@ def ww_calc(
         Series containing the starting dates of weather windows
 
     """
-    windetect = []
-    tstep = _get_timestep(critsubs)
-    k = 0
-    count = 0
-    while k < (critsubs.shape[0] - 2):
-        strtwin = critsubs.index.values[k]
-        thistime = strtwin
-        nexttime = critsubs.index.values[k + 1]
-        while pd.Timedelta(nexttime - thistime) <= tstep and k < (
-            critsubs.shape[0] - 2
-        ):
-            k += 1
-            if pd.Timedelta(nexttime - strtwin) >= dt.timedelta(seconds=3600 * winlen):
-                windetect.append(strtwin)
-                break
-            else:
-                thistime = critsubs.index.values[k]
-                nexttime = critsubs.index.values[k + 1]
-        count += 1
-        k = count if not concurrent_windows else k + 1
+    tstep = _get_timestep(critsubs).to_timedelta64()
+    times = critsubs.index.values
+    nb_times = len(times)
+    if nb_times < 3:
+        return pd.Series(pd.to_datetime([]))
+
+    # run-length encoding of the uninterrupted periods: a new run starts
+    # wherever the gap with the previous timestamp is larger than the timestep
+    run_id = np.concatenate(([0], np.cumsum(np.diff(times) > tstep)))
+
+    # for each potential start, the first timestamp reaching the window length
+    window_end = np.searchsorted(
+        times, times + pd.Timedelta(hours=winlen).to_timedelta64(), side="left"
+    )
+    window_end = np.maximum(window_end, np.arange(1, nb_times + 1))
 
+    # a window is found if it ends within the same run (and never on the last
+    # timestamp, as the previous loop-based implementation did)
+    is_window = window_end <= nb_times - 2
+    is_window[is_window] = run_id[window_end[is_window]] == run_id[is_window]
+
+    if not concurrent_windows:
+        return pd.Series(pd.to_datetime(times[is_window]))
+
+    # back-to-back windows: the search restarts after the end of the previous
+    # window, or at the beginning of the next run if no window was found.
+    windetect = times[_ww_scan(is_window, window_end, run_id)]
     return pd.Series(pd.to_datetime(windetect))
 
 
@@ -233,34 +240,23 @@ def oplen_calc(critsubs, oplen, critical_operation=False, date=1, monstrt=True):
     else:
         raise NameError("Input option monstrt should be boolean")
 
-    for strtime in oplendetect.index:
-        if critsubs.index.max() >= strtime:
-            k = critsubs.index.get_loc(critsubs.index[critsubs.index >= strtime].min())
-        else:
-            break
-
-        stopflg = False
-        count = 0
-        dur = dt.timedelta(seconds=0)
-        while not stopflg:
-            if dur >= dt.timedelta(seconds=3600 * oplen):
-                stopflg = True
-                oplendetect.at[strtime] = critsubs.index[k] - strtime
-            else:
-                k += 1
-            if k >= (critsubs.shape[0] - 1):
-                stopflg = True
-
-            if not critical_operation:
-                dur = dur + tstep
-            else:
-                if count > 0 and (critsubs.index[k] - critsubs.index[k - 1]) <= tstep:
-                    dur = dur + tstep
-                elif count == 0:
-                    dur = dur + tstep
-                else:
-                    dur = dt.timedelta(seconds=0)
-                count += 1
+    # the kernel works on nanoseconds, whatever the unit of the index
+    times = critsubs.index.values.astype("datetime64[ns]")
+    # operations starting after the end of the data can not be computed
+    start_times = oplendetect.index.values.astype("datetime64[ns]")
+    start_times = start_times[start_times <= times.max()]
+    end_positions = _oplen_scan(
+        times.view(np.int64),
+        np.searchsorted(times, start_times, side="left"),
+        pd.Timedelta(hours=oplen).value,
+        tstep.value,
+        critical_operation,
+    )
+
+    completed = np.flatnonzero(end_positions >= 0)
+    oplendetect.iloc[completed] = (
+        times[end_positions[completed]] - start_times[completed]
+    )
     return oplendetect
 
 
@@ -281,17 +277,14 @@ def wwmonstats(windetect):
         Returns number of weather window by year/month.
 
     """
-    yeun = windetect.dt.year.unique()
-    moun = windetect.dt.month.unique()
-    yeun.sort()
-    wwmonres = pd.DataFrame(
-        np.zeros([yeun.shape[0], moun.shape[0]]), columns=moun, index=yeun
+    wwmonres = (
+        windetect.groupby([windetect.dt.year, windetect.dt.month])
+        .size()
+        .unstack(fill_value=0)
+        .astype(float)
+        .rename_axis(index=None, columns=None)
     )
 
-    for ye, mo in product(yeun, moun):
-        subs = windetect[(windetect.dt.year == ye) & (windetect.dt.month == mo)]
-        wwmonres.at[ye, mo] = subs.shape[0]
-
     return wwmonres
 
 
@@ -312,18 +305,12 @@ def olmonstats(oplendetect):
         Returns operational length in hours by year/month.
 
     """
-    yeun = oplendetect.index.year.unique().to_numpy()
-    moun = oplendetect.index.month.unique().to_numpy()
-
-    moun.sort()
-    yeun.sort()
-
-    olmonres = pd.DataFrame(
-        np.zeros([yeun.shape[0], moun.shape[0]]), columns=moun, index=yeun
+    # operational length in hours, truncated to the second
+    hours = (oplendetect.dt.days * 24 + oplendetect.dt.seconds / 3600).astype(float)
+    olmonres = (
+        hours.groupby([oplendetect.index.year, oplendetect.index.month])
+        .first()
+        .unstack(fill_value=0.0)
+        .rename_axis(index=None, columns=None)
     )
-    for ye, mo in product(yeun, moun):
-        subs = oplendetect[
-            (oplendetect.index.year == ye) & (oplendetect.index.month == mo)
-        ]
-        olmonres.at[ye, mo] = subs[0].days * 24 + subs[0].seconds / 3600
     return olmonres
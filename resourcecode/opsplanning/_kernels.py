@@ -0,0 +1,118 @@
+# coding: utf-8
+
+# Copyright 2020-2022 IFREMER (Brest, FRANCE), all rights reserved.
+# contact -- mailto:nicolas.raillard@ifremer.fr
+#
+# This file is part of Resourcecode.
+# Based on a code written by David Darbinyan (david.darbinyan@emec.org.uk)
+#
+# Resourcecode is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3.0 of the License, or any later version.
+#
+# Resourcecode is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along
+# with Resourcecode. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Sequential scans of the operational planning module.
+
+Those kernels work on raw numpy arrays (timestamps as int64 nanoseconds), so
+that they can be compiled by numba when it is installed.
+"""
+
+import numpy as np
+
+from resourcecode.utils import njit
+
+
+@njit(cache=True, nogil=True)
+def _ww_scan(
+    is_window: np.ndarray, window_end: np.ndarray, run_id: np.ndarray
+) -> np.ndarray:
+    """Flag the starts of back-to-back weather windows.
+
+    Parameters
+    ----------
+    is_window: boolean array
+        True if a weather window can start at this timestamp
+    window_end: integer array
+        the position of the end of the window starting at this timestamp
+    run_id: integer array
+        the index of the uninterrupted period containing this timestamp
+
+    Returns
+    -------
+    starts: a boolean array, True at the start of each window
+    """
+    nb_times = len(is_window)
+    starts = np.zeros(nb_times, dtype=np.bool_)
+    k = 0
+    while k < nb_times - 2:
+        if is_window[k]:
+            starts[k] = True
+            # the next search starts after the end of the window
+            k = window_end[k] + 1
+        else:
+            # no window in this run: go to the beginning of the next one
+            current_run = run_id[k]
+            while k < nb_times and run_id[k] == current_run:
+                k += 1
+    return starts
+
+
+@njit(cache=True, nogil=True)
+def _oplen_scan(
+    times: np.ndarray,
+    start_positions: np.ndarray,
+    oplen: np.int64,
+    tstep: np.int64,
+    critical_operation: bool,
+) -> np.ndarray:
+    """Find the end of the operations starting at the given positions.
+
+    Parameters
+    ----------
+    times: int64 array
+        the timestamps (in ns) of the data matching the criteria
+    start_positions: int64 array
+        the position in `times` where each operation starts
+    oplen: int64
+        the nominal length of the operation (in ns)
+    tstep: int64
+        the timestep of the data (in ns)
+    critical_operation: bool
+        if True, the operation restarts from the beginning after a downtime
+
+    Returns
+    -------
+    end_positions: int64 array
+        the position in `times` where each operation ends, or -1 if the
+        operation can not be completed before the end of the data.
+    """
+    nb_times = len(times)
+    end_positions = np.full(len(start_positions), -1, dtype=np.int64)
+    for i in range(len(start_positions)):
+        k = start_positions[i]
+        duration = np.int64(0)
+        count = 0
+        while True:
+            if duration >= oplen:
+                end_positions[i] = k
+                break
+            k += 1
+            if k >= nb_times - 1:
+                break
+
+            if not critical_operation:
+                duration += tstep
+            elif count == 0 or times[k] - times[k - 1] <= tstep:
+                duration += tstep
+            else:
+                duration = np.int64(0)
+            count += 1
+    return end_positions
@@ -26,6 +26,46 @@ import numpy as np
 import pandas as pd
 
 
+def _trapezoid_weights(x: np.ndarray) -> np.ndarray:
+    """Return the weights w such that np.trapz(y, x) == w @ y
+
+    :param x: sample points
+    :type x: numpy.array
+    :return: trapezoidal rule weights
+    :rtype: numpy.array"""
+
+    dx = np.diff(x)
+    weights = np.zeros(len(x))
+    weights[:-1] += dx / 2
+    weights[1:] += dx / 2
+    return weights
+
+
+def _moment_weights(f: np.ndarray, n: int = 0, nf0: int = 600) -> np.ndarray:
+    """Return the weights w such that w @ s is the n-th moment of the spectrum
+    s, linearly interpolated on nf0 regularly spaced frequencies
+
+    :param f: frequency values (increasing)
+    :type f: numpy.array
+    :param n: moment order
+    :type n: int
+    :param nf0: number of frequencies used for the integration
+    :type nf0: int
+    :return: moment weights
+    :rtype: numpy.array"""
+
+    f0 = np.linspace(np.min(f), np.max(f), nf0)
+    weights0 = _trapezoid_weights(f0) * np.power(f0, n)
+
+    # each regular frequency is interpolated between f[j] and f[j + 1]
+    j = np.clip(np.searchsorted(f, f0, side="right") - 1, 0, len(f) - 2)
+    w = (f0 - f[j]) / (f[j + 1] - f[j])
+    weights = np.zeros(len(f))
+    np.add.at(weights, j, weights0 * (1 - w))
+    np.add.at(weights, j + 1, weights0 * w)
+    return weights
+
+
 class PTO:
     """PTO object, storing capture width, wave spectrum, and computing PTO data such as time series
     of wave power, absorbed power, mean power, median power, PTO damping"""
@@ -40,20 +80,15 @@ class PTO:
         self.times = s.index  # time vector
         self.freqs = s.columns  # frequency vector
         # time domain data
-        self.power = pd.DataFrame(
-            np.zeros(len(self.times)), index=self.times
-        )  # absorbed power (W)
-        # absorbed power, no reduction (W)
-        self.power_no_red = pd.DataFrame(np.zeros(len(self.times)), index=self.times)
+        self.power = None  # absorbed power (W)
+        self.power_no_red = None  # absorbed power, no reduction (W)
         self.mean_power = None  # mean absorbed power (W)
         self.mean_power_no_red = None  # mean absorbed power, no reduction (W)
         self.median_power = None  # median absorbed power (W)
         self.median_power_no_red = None  # median absorbed power, no reduction (W)
-        self.pto_damp = pd.DataFrame(
-            np.zeros(len(self.times)), index=self.times
-        )  # PTO damping (Ns/m)
-        # PTO damping, no reduction (Ns/m)
-        self.pto_damp_no_red = pd.DataFrame(np.zeros(len(self.times)), index=self.times)
+        self.pto_damp = None  # PTO damping (Ns/m)
+        self.pto_damp_no_red = None  # PTO damping, no reduction (Ns/m)
+        self.wave_power = None  # incident wave power (W)
         self.cumulative_power = None  # cumulative power (W)
         # frequency domain data
         self.freq_data = (
@@ -79,89 +114,83 @@ class PTO:
         if len(wave_freq) != len(capture_width_freq):
             return False
         else:
-            return abs(wave_freq - capture_width_freq).max() > tolerance
+            return abs(wave_freq - capture_width_freq).max() <= tolerance
 
     def interp_freq(self):
         """Checks if wave frequency and capture width frequency are the same at a given tolerance.
-        If not, interpolates the capture width table"""
+        If not, interpolates the capture width table on the wave frequencies"""
 
-        known_freqs = set(self.capture_width.index)
         tolerance = 0.001
         if self.is_same_freq(tolerance):
             self.freqs = self.capture_width.index
         else:
-            for freq in self.freqs:
-                if freq in known_freqs:
-                    continue
-
-                known_freqs.add(freq)
-                self.capture_width = self.capture_width.append(
-                    pd.Series(name=freq, dtype="float64")
-                )
-                self.capture_width.sort_index(inplace=True)
-                self.capture_width = self.capture_width.interpolate()
+            # linear interpolation of the capture width of each PTO damping
+            order = np.argsort(self.capture_width.index.to_numpy())
+            known_freqs = self.capture_width.index.to_numpy(dtype=float)[order]
+            known_values = self.capture_width.to_numpy()[order]
+            wave_freqs = self.freqs.to_numpy(dtype=float)
+            self.capture_width = pd.DataFrame(
+                np.column_stack(
+                    [
+                        np.interp(wave_freqs, known_freqs, values)
+                        for values in known_values.T
+                    ]
+                ),
+                index=self.freqs,
+                columns=self.capture_width.columns,
+            )
 
     def get_power_pto_damp(self):
         """Compute absorbed power, mean power, median power, PTO damping time series"""
 
-        # frequency domain data
-        hs_list = []
-        tp_list = []
-
         # group velocity
         # infinite depth assumption
         c_g = (self.g / (4 * mt.pi)) / self.freqs
 
-        for i, t in enumerate(self.times):
-            # Hs, Tp conditions
-            s = self.s.iloc[i]
-
-            m_m1 = self.compute_spectrum_moment(self.freqs, s, n=-1)
-            m_0 = self.compute_spectrum_moment(self.freqs, s, n=0)
-            m_2 = self.compute_spectrum_moment(self.freqs, s, n=2)
-
-            hs = 4 * np.sqrt(m_0)
-            te = m_m1 / m_0
-            tz = np.sqrt(m_0 / m_2)
-            gamma = 1  # assumption
-            tp = te * 1.16637561872 * gamma**-0.0433388762904
-            # sea-state steepness computation
-            if self.coef_power_decrement:
-                s_s = 2.0 * np.pi * hs / (self.g * tz**2)
-            else:
-                s_s = 0
-            power_t = pd.DataFrame(
-                (
-                    (self.rho * self.g * self.width)
-                    * np.trapz(
-                        (((c_g * s).to_numpy())[:, np.newaxis] * self.capture_width).T,
-                        x=self.freqs,
-                    )
-                ),
-                index=self.capture_width.columns,
+        # absorbed power for each time (rows) and each PTO damping (columns):
+        # the integral over the frequencies of c_g * s * capture_width is a
+        # weighted sum, computed for all the times with a single product.
+        weights = _trapezoid_weights(self.freqs.to_numpy()) * c_g.to_numpy()
+        power_no_red = (self.rho * self.g * self.width) * (
+            (self.s.to_numpy() * weights) @ self.capture_width.to_numpy()
+        )
+
+        # Hs, Tp conditions
+        m_m1, m_0, m_2 = (
+            self.compute_spectrum_moment(self.freqs, self.s, n=n) for n in (-1, 0, 2)
+        )
+        hs = 4 * np.sqrt(m_0)
+        te = m_m1 / m_0
+        tz = np.sqrt(m_0 / m_2)
+        gamma = 1  # assumption
+        tp = te * 1.16637561872 * gamma**-0.0433388762904
+
+        # the capture width decreases when the sea-state steepness is too high.
+        # Without reduction, the steepness is 0 and the coefficient is 1.
+        coef = np.ones(len(self.times))
+        if self.coef_power_decrement:
+            s_s = 2.0 * np.pi * hs / (self.g * tz**2)
+            high_steepness = s_s > 0.02
+            # estimate new decreased capture width ratio
+            coef[high_steepness] = (
+                np.cos(np.pi * (s_s[high_steepness] - 0.02) / 0.36) ** 2.0
             )
-            power_t_no_red = power_t.copy()
-            if np.logical_and(self.coef_power_decrement, s_s > 0.02):
-                # estimate new decreased capture width ratio
-                coef = np.cos(np.pi * (s_s - 0.02) / 0.36) ** 2.0
-                # get new power estimate
-                power_t = power_t.mul(coef)
-            # safety mode, no power absorbed
-            elif s_s > 0.1:
-                power_t = 0
-            # PTO damping chosen for best power capture
-            # (including reduction capture if wave steepness too high)
-            pto_opt = power_t.idxmax()
-            self.pto_damp.iloc[i] = pto_opt
-            self.power.iloc[i] = power_t.loc[pto_opt.values].values
-            # PTO damping chosen for best power capture (without reduction)
-            pto_opt_no_red = power_t_no_red.idxmax()
-            self.pto_damp_no_red.iloc[i] = pto_opt_no_red
-            self.power_no_red.iloc[i] = power_t_no_red.loc[pto_opt_no_red.values].values
-            # wave power computation
-            # frequency domain data
-            hs_list.append(hs)
-            tp_list.append(tp)
+        power = power_no_red * coef[:, np.newaxis]
+
+        # PTO damping chosen for best power capture, with and without
+        # reduction of the capture width
+        pto_damp_values = self.capture_width.columns.to_numpy()
+        rows = np.arange(len(self.times))
+        best = power.argmax(axis=1)
+        best_no_red = power_no_red.argmax(axis=1)
+        self.pto_damp = pd.DataFrame(pto_damp_values[best], index=self.times)
+        self.power = pd.DataFrame(power[rows, best], index=self.times)
+        self.pto_damp_no_red = pd.DataFrame(
+            pto_damp_values[best_no_red], index=self.times
+        )
+        self.power_no_red = pd.DataFrame(
+            power_no_red[rows, best_no_red], index=self.times
+        )
 
         self.wave_power = pd.DataFrame(
             self.rho * self.g * self.width * np.trapz(c_g * self.s, x=self.freqs),
@@ -170,8 +199,8 @@ class PTO:
 
         self.freq_data = pd.DataFrame(
             {
-                "Hs": hs_list,
-                "Tp": tp_list,
+                "Hs": hs,
+                "Tp": tp,
                 "Power": self.power.values.flatten(),
                 "PTO damping": self.pto_damp.values.flatten(),
             }
@@ -205,23 +234,14 @@ class PTO:
 
         :param f: frequency values
         :type f: numpy.array
-        :param s: wave spectrum
+        :param s: wave spectrum, or one wave spectrum per row
         :type s: numpy.array
         :param n: moment order
         :type n: int
-        :return: moment value
-        :rtype: float"""
-
-        fmin = np.min(f)
-        fmax = np.max(f)
-        nf0 = 600
-        f0 = np.linspace(fmin, fmax, nf0)
-        s0 = np.interp(f0, f, s)
+        :return: moment value, or one moment value per row
+        :rtype: float or numpy.array"""
 
-        fn = np.power(f0, n)
-        mn = np.trapz(s0 * fn, x=f0)
-
-        return mn
+        return np.asarray(s) @ _moment_weights(np.asarray(f, dtype=float), n)
 
     def to_dataframe(self):
         headers = [
@@ -235,19 +255,23 @@ class PTO:
             "PTO damping (with reduction factor)",
             "PTO damping (without reduction factor)",
         ]
-        all_data = np.stack(
-            (
-                self.wave_power[0],
-                self.power[0],
-                self.power_no_red[0],
-                self.median_power[0],
-                self.median_power_no_red[0],
-                self.mean_power[0],
-                self.mean_power_no_red[0],
-                self.pto_damp[0],
-                self.pto_damp_no_red[0],
-            )
-        ).transpose()
+        # one contiguous array, in the order of the headers
+        all_data = np.column_stack(
+            [
+                frame.to_numpy()[:, 0]
+                for frame in (
+                    self.wave_power,
+                    self.power,
+                    self.power_no_red,
+                    self.mean_power,
+                    self.mean_power_no_red,
+                    self.median_power,
+                    self.median_power_no_red,
+                    self.pto_damp,
+                    self.pto_damp_no_red,
+                )
+            ]
+        )
         return pd.DataFrame(all_data, index=self.times, columns=headers)
 
     def to_csv(self, csv_path):
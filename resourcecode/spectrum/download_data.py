@@ -66,7 +66,7 @@ def download_single_2D_file(
         + "_spec.nc"
     )
 
-    if point not in set(get_grid_spec().name):
+    if point not in set(get_grid_spec(columns=["name"]).name):
         raise ValueError(f"{point} is an unkown location")
 
     if (
@@ -130,7 +130,7 @@ def download_single_1D_file(
         + "_freq.nc"
     )
 
-    if point not in set(get_grid_spec().name):
+    if point not in set(get_grid_spec(columns=["name"]).name):
         raise ValueError(f"{point} is an unkown location")
 
     if (
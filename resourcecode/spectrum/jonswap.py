@@ -30,9 +30,10 @@ def jonswap(hs: float, tp: float, gamma: float, freq: np.ndarray) -> np.ndarray:
     ----------
 
     hs: m
-        Significant wave height
+        Significant wave height, or an array of shape [Nx1] to compute N
+        spectra at once
     tp: s
-        Peak period
+        Peak period, or an array of shape [Nx1]
     freq: Hz
         the frequency vector where the spectrum is to be computed
     gamma:
@@ -42,7 +43,8 @@ def jonswap(hs: float, tp: float, gamma: float, freq: np.ndarray) -> np.ndarray:
     Returns
     -------
 
-    out: vector containing the spectrum on input freq
+    out: vector containing the spectrum on input freq (or an [NxF] array, one
+        spectrum per row)
     """
     freq = freq[freq > 0]
 
@@ -52,16 +54,20 @@ def jonswap(hs: float, tp: float, gamma: float, freq: np.ndarray) -> np.ndarray:
         "* (hs ** 2)"
         "/ (tp ** 4)"
         "* exp(-5.0 / (4 * tp ** 4) /(freq ** 4))"
-        "* gamma ** ("
-        "   exp("
-        "       -((freq - 1 / tp) ** 2)"
-        "       * (tp ** 2)"
-        "       / (2 * (where(freq < (1.0 / tp), 0.07, 0.09) ** 2))"
-        "   )"
-        ")"
     )
+    if gamma != 1:
+        # the peak enhancement factor is 1 everywhere when gamma = 1
+        expr += (
+            "* gamma ** ("
+            "   exp("
+            "       -((freq - 1 / tp) ** 2)"
+            "       * (tp ** 2)"
+            "       / (2 * (where(freq < (1.0 / tp), 0.07, 0.09) ** 2))"
+            "   )"
+            ")"
+        )
     sf = ne.evaluate(expr)
-    alpha = (hs**2) / (16 * np.trapz(sf, x=freq))
+    alpha = (hs**2) / (16 * np.trapz(sf, x=freq)[..., np.newaxis])
     return alpha * sf
 
 
@@ -89,11 +95,12 @@ def compute_jonswap_wave_spectrum(
         The jonswap spectrum
     """
 
-    def compute_jsonswap_vector(hs, tp):
-        return pd.Series(jonswap(hs, tp, gamma=gamma, freq=freq), index=freq)
-
-    spectrum = seastate_data.apply(
-        lambda x: compute_jsonswap_vector(x["hs"], x["tp"]),
-        axis=1,
+    freq = np.asarray(freq)
+    # all the spectra are computed at once, one per row
+    spectrum = jonswap(
+        seastate_data["hs"].to_numpy()[:, np.newaxis],
+        seastate_data["tp"].to_numpy()[:, np.newaxis],
+        gamma=gamma,
+        freq=freq,
     )
-    return spectrum
+    return pd.DataFrame(spectrum, index=seastate_data.index, columns=freq[freq > 0])
@@ -28,6 +28,36 @@ from typing import Union, Tuple
 import numpy as np
 from numpy import triu_indices, tril_indices
 
+
+def _njit_fallback(*args, **kwargs):
+    """Fallback for `numba.njit`: return the function unchanged"""
+    if len(args) == 1 and callable(args[0]):
+        return args[0]
+    return lambda function: function
+
+
+def __getattr__(name: str):
+    """Provide `njit`, `prange` and `get_num_threads` from numba, if it is
+    installed.
+
+    numba is slow to import, so it is only imported when a module defining
+    compiled kernels asks for them.
+    """
+    fallbacks = {
+        "njit": _njit_fallback,
+        "prange": range,
+        "get_num_threads": lambda: 1,
+    }
+    if name not in fallbacks:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    try:
+        import numba
+    except ImportError:  # numba is an optional dependency
+        return fallbacks[name]
+    return getattr(numba, name)
+
+
 CONFIG_FILEPATHS = [
     os.environ.get("RESOURCECODE_CONFIG_FILEPATH"),
     "./resourcecode.ini",
@@ -73,12 +103,14 @@ def set_trig(m, values, part="upper"):
         m[i, j] = values[n]
 
 
+EARTH_RADIUS_METER = 6367e3
+
+
 def haversine(lon1, lat1, lon2, lat2):
     """
     Calculate the great circle distance between two points
     on the earth (specified in decimal degrees)
     """
-    EARTH_RADIUS_METER = 6367e3
     lon1, lat1, lon2, lat2 = map(np.radians, [lon1, lat1, lon2, lat2])
 
     dlon = lon2 - lon1
@@ -97,6 +129,9 @@ def zmcomp2metconv(
     Converts wind or current zonal and meridional velocity components to
     magnitude and direction according to meteorological convention.
 
+    The components may be given as scalars, numpy arrays or pandas Series;
+    the results are numpy arrays (or scalars).
+
     Parameters
     ----------
     u:
@@ -112,7 +147,10 @@ def zmcomp2metconv(
         direction from which flow comes (<B0>)
     """
 
-    V = np.sqrt(u**2 + v**2)
-    D = (270 - np.arctan2(v, u) * 180 / np.pi) % 360
+    u = np.asarray(u)
+    v = np.asarray(v)
+
+    V = np.hypot(u, v)
+    D = np.mod(270.0 - np.degrees(np.arctan2(v, u)), 360.0)
 
     return (V, D)
@@ -40,7 +40,7 @@ install_requires = [
     "requests >= 2.23.0",
     "numpy >= 1.20.1, < 2.0.0",
     "scipy >= 1.6.1",
-    "pyextremes >= 2.0.0",
+    "pyextremes >= 2.2.0",
     "pytest >= 7.0.0",
     "pyarrow >= 6.0.0",
     "plotly >= 4.12.0",
@@ -49,6 +49,10 @@ install_requires = [
     "netCDF4 >= 1.6.0",
 ]
 
+extras_require = {
+    "numba": ["numba >= 0.56.0"],
+}
+
 classifiers = [
     "Development Status :: 5 - Production/Stable",
     "Intended Audience :: Science/Research",
@@ -94,6 +98,7 @@ setup(
     long_description=open("README.md", "r").read(),
     long_description_content_type="text/markdown",
     install_requires=install_requires,
+    extras_require=extras_require,
     classifiers=classifiers,
     keywords=keywords,
     url=url,
@@ -22,29 +22,31 @@ from unittest import mock
 from datetime import datetime
 
 import pytest
+import numpy as np
 import pandas as pd
 
 import resourcecode
+from resourcecode.client import _to_timestamp
 from resourcecode.exceptions import BadPointIdError, BadParameterError
 
 from . import DATA_DIR
 
 
-def mock_requests_get_raw_data(query_url, parameters):
-    """this function mocks the 'requests.get' call in the `_get_rawdata` method
-    of the Client.
+def mock_requests_get_raw_data(query_url, params):
+    """this function mocks the 'requests.Session.get' call in the `_get_rawdata`
+    method of the Client.
 
-    it reads the parameters given `requests.get` call, opens the corresponding
-    file, and return a Response object. This Response object is a Mock, which
-    has one attribute `ok` (True if a file has been read, False otherwise), and
-    one method `json`. Calling this method will return the content of the
-    requested file.
+    it reads the parameters given `requests.Session.get` call, opens the
+    corresponding file, and return a Response object. This Response object is a
+    Mock, which has one attribute `ok` (True if a file has been read, False
+    otherwise), and one method `json`. Calling this method will return the
+    content of the requested file.
     """
 
     mocked_response = mock.Mock()
-    parameter = parameters.get("parameter", [None])[0]
-    start_date = parameters.get("start")
-    end_date = parameters.get("end")
+    parameter = params.get("parameter", [None])[0]
+    start_date = params.get("start")
+    end_date = params.get("end")
     data_path = DATA_DIR / f"timeseries_{parameter}.json"
 
     if not data_path.exists():
@@ -79,14 +81,15 @@ def mock_requests_get_raw_data(query_url, parameters):
 
 @pytest.fixture
 def client():
-    """This fixture returns a « fake client » in the sense that the requests.get
-    function is mocked to return a file from the DATA_DIR directory.
+    """This fixture returns a « fake client » in the sense that the
+    requests.Session.get method is mocked to return a file from the DATA_DIR
+    directory.
 
     Except for that, this client is exactly as the "real" client.
 
     """
     client = resourcecode.Client()
-    with mock.patch("requests.get", side_effect=mock_requests_get_raw_data):
+    with mock.patch("requests.Session.get", side_effect=mock_requests_get_raw_data):
         yield client
 
 
@@ -100,7 +103,7 @@ def test_import_client():
 def test_unknown_parameters_and_pointid():
     client = resourcecode.Client()
 
-    with mock.patch("requests.get", side_effect=mock_requests_get_raw_data):
+    with mock.patch("requests.Session.get", side_effect=mock_requests_get_raw_data):
         assert not client.get_dataframe(
             pointId=1,
             parameters=[
@@ -140,7 +143,7 @@ def test_get_raw_data():
     client = resourcecode.Client()
 
     with mock.patch(
-        "requests.get", side_effect=mock_requests_get_raw_data
+        "requests.Session.get", side_effect=mock_requests_get_raw_data
     ) as mock_requests_get:
         json_data = client._get_rawdata_from_criteria(
             {
@@ -151,7 +154,7 @@ def test_get_raw_data():
         )
 
     mock_requests_get.assert_called_once_with(
-        client.cassandra_base_url + "api/timeseries", {"parameter": [parameter]}
+        client.cassandra_base_url + "api/timeseries", params={"parameter": [parameter]}
     )
     assert json_data["query"]["parameterCode"] == parameter
 
@@ -170,6 +173,11 @@ def test_get_criteria_single_parameter(client):
     assert data.fp[-1] == pytest.approx(0.097)
 
 
+def test_get_criteria_node_as_string(client):
+    data = client.get_dataframe_from_criteria('{"node": "42", "parameter": ["fp"]}')
+    assert len(data) == 744
+
+
 def test_get_criteria_single_tp_parameter(client):
     data = client.get_dataframe_from_criteria('{"parameter": ["tp"]}')
 
@@ -181,6 +189,24 @@ def test_get_criteria_single_tp_parameter(client):
     assert data.tp[-1] == pytest.approx(10.30928)
 
 
+def test_get_criteria_tp_and_fp_parameters():
+    client = resourcecode.Client()
+    with mock.patch(
+        "requests.Session.get", side_effect=mock_requests_get_raw_data
+    ) as mock_get:
+        data = client.get_dataframe_from_criteria(
+            '{"parameter": ["tp", "fp", "tp"]}', dtype=np.float32
+        )
+
+    # fp is queried once, and tp is derived from it
+    mock_get.assert_called_once()
+    assert list(data.columns) == ["tp", "fp", "tp"]
+    assert data.iloc[0, 0] == pytest.approx(13.51351)
+    assert data.iloc[0, 1] == pytest.approx(0.074)
+    np.testing.assert_array_equal(data.iloc[:, 0], data.iloc[:, 2])
+    np.testing.assert_allclose(data.iloc[:, 0], 1 / data.iloc[:, 1], rtol=1e-6)
+
+
 def test_get_criteria_multiple_parameters(client):
     data = client.get_dataframe_from_criteria('{"parameter": ["fp", "hs"]}')
 
@@ -194,6 +220,35 @@ def test_get_criteria_multiple_parameters(client):
     assert data.hs[-1] == pytest.approx(0.756)
 
 
+def test_get_criteria_dtype(client):
+    data = client.get_dataframe_from_criteria('{"parameter": ["fp", "hs"]}')
+    data32 = client.get_dataframe_from_criteria(
+        '{"parameter": ["fp", "hs"]}', dtype=np.float32
+    )
+
+    assert (data32.dtypes == np.float32).all()
+    pd.testing.assert_frame_equal(data32, data.astype(np.float32))
+
+    # each column is stored contiguously
+    for column in data.columns:
+        assert data[column].to_numpy().flags.c_contiguous
+
+
+def test_get_criteria_empty_response(capsys):
+    client = resourcecode.Client()
+    empty_response = mock.Mock(ok=True)
+    empty_response.json.return_value = {
+        "query": {"dataSetSize": 0},
+        "result": {"data": []},
+    }
+
+    with mock.patch("requests.Session.get", return_value=empty_response):
+        data = client.get_dataframe_from_criteria('{"parameter": ["hs"]}')
+
+    assert data.empty
+    assert "API failed" in capsys.readouterr().err
+
+
 def test_get_criteria_multiple_parameters_and_none_values(client):
     data = client.get_dataframe_from_criteria('{"parameter": ["uust"]}')
 
@@ -250,3 +305,78 @@ def test_different_available_methods_to_get_data(client):
 
     assert (data_from_url == data_from_critera).all().bool()
     assert (data_from_args == data_from_critera).all().bool()
+
+
+def test_to_timestamp():
+    naive = int(datetime(2017, 1, 1).timestamp())
+    assert _to_timestamp("2017-01-01T00:00:00") == naive
+    assert _to_timestamp(datetime(2017, 1, 1)) == naive
+    assert _to_timestamp("2017-01-01T00:00:00Z") == 1483228800
+    assert _to_timestamp("2017-01-01T01:00:00+01:00") == 1483228800
+    assert _to_timestamp(np.int64(1483228800)) == 1483228800
+    assert _to_timestamp(None) is None
+
+
+def test_get_dataframe_cache(tmp_path):
+    client = resourcecode.Client(cache_dir=tmp_path)
+    selection = {
+        "pointId": 42,
+        "startDateTime": "2017-01-01T00:00:00Z",
+        "endDateTime": "2017-01-10T00:00:00Z",
+    }
+
+    with mock.patch(
+        "requests.Session.get", side_effect=mock_requests_get_raw_data
+    ) as mock_requests_get:
+        data = client.get_dataframe(**selection, parameters=("hs", "tp"))
+        assert mock_requests_get.call_count == 2
+        assert len(list(tmp_path.glob("*.npy"))) == 2
+
+        cached_data = client.get_dataframe(**selection, parameters=("hs", "tp"))
+        assert mock_requests_get.call_count == 2
+
+        # only the parameters not cached yet are downloaded
+        client.get_dataframe(**selection, parameters=("hs", "uust"))
+        assert mock_requests_get.call_count == 3
+
+        # selections without end date are not cached
+        client.get_dataframe(pointId=42, parameters=("hs",))
+        assert mock_requests_get.call_count == 4
+        assert len(list(tmp_path.glob("*.npy"))) == 3
+
+    pd.testing.assert_frame_equal(data, cached_data)
+
+
+def test_get_dataframe_cache_recovery(tmp_path):
+    client = resourcecode.Client(cache_dir=tmp_path)
+    selection = {
+        "pointId": 42,
+        "startDateTime": "2017-01-01T00:00:00Z",
+        "endDateTime": "2017-01-10T00:00:00Z",
+        "parameters": ("hs",),
+    }
+
+    with mock.patch(
+        "requests.Session.get", side_effect=mock_requests_get_raw_data
+    ) as mock_requests_get:
+        # a failed write leaves nothing in the cache
+        with mock.patch("numpy.save", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                client.get_dataframe(**selection)
+        assert list(tmp_path.iterdir()) == []
+
+        data = client.get_dataframe(**selection)
+        (cache_path,) = tmp_path.glob("*.npy")
+
+        # a truncated file is downloaded again, and replaced
+        cache_path.write_bytes(cache_path.read_bytes()[:100])
+        pd.testing.assert_frame_equal(client.get_dataframe(**selection), data)
+        assert mock_requests_get.call_count == 3
+        pd.testing.assert_frame_equal(client.get_dataframe(**selection), data)
+        assert mock_requests_get.call_count == 3
+
+        # the clients of another database do not share the cache
+        client.config.set("default", "cassandra-base-url", "https://other/")
+        client.get_dataframe(**selection)
+        assert mock_requests_get.call_count == 4
+        assert len(list(tmp_path.glob("*.npy"))) == 2
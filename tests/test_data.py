@@ -17,7 +17,12 @@
 # You should have received a copy of the GNU General Public License along
 # with Resourcecode. If not, see <https://www.gnu.org/licenses/>.
 
+import numpy as np
+
 from resourcecode import (
+    get_closest_point,
+    get_closest_points,
+    get_closest_station,
     get_coastline,
     get_grid_field,
     get_grid_spec,
@@ -25,6 +30,7 @@ from resourcecode import (
     get_triangles,
     get_variables,
 )
+from resourcecode.utils import haversine
 
 
 def _check_loader(loader, expected_columns):
@@ -51,3 +57,51 @@ def test_load_data():
     _check_loader(get_islands, ["longitude", "latitude", "depth", "ID"])
     _check_loader(get_triangles, ["Corner 1", "Corner 2", "Corner 3"])
     _check_loader(get_variables, ["name", "longname", "unit"])
+
+
+def test_load_data_copy():
+    """Assert the loaders return a copy of the cached data"""
+
+    data = get_variables()
+    data["name"] = "foo"
+    assert (get_variables().name != "foo").all()
+
+    data = get_variables(columns=["unit", "name"])
+    assert (data.columns == ["unit", "name"]).all()
+    data["name"] = "foo"
+    assert (get_variables().name != "foo").all()
+
+    data = get_variables(use_threads=False)
+    assert (data.columns == ["name", "longname", "unit"]).all()
+
+
+def test_get_closest():
+    """Assert the closest node is the one with the smallest great circle
+    distance"""
+
+    latitude, longitude = 48.3, -4.6
+    for getter, loader, attribute in (
+        (get_closest_point, get_grid_field, "node"),
+        (get_closest_station, get_grid_spec, "name"),
+    ):
+        dataset = loader()
+        distances = haversine(dataset.longitude, dataset.latitude, longitude, latitude)
+        expected = distances.idxmin()
+
+        closest, distance = getter(latitude=latitude, longitude=longitude)
+        assert closest == dataset.loc[expected, attribute]
+        assert np.isclose(distance, distances[expected], atol=0.01)
+
+
+def test_get_closest_points():
+    """Assert the batched lookup matches the single point one"""
+
+    latitudes = np.array([48.3, 45.0, 43.5])
+    longitudes = np.array([-4.6, -2.0, -8.5])
+
+    closest, distances = get_closest_points(latitudes, longitudes)
+    assert closest.shape == distances.shape == (3,)
+    for latitude, longitude, node, distance in zip(
+        latitudes, longitudes, closest, distances
+    ):
+        assert get_closest_point(latitude, longitude) == (node, distance)
@@ -16,16 +16,22 @@
 #
 # You should have received a copy of the GNU General Public License along
 # with Resourcecode. If not, see <https://www.gnu.org/licenses/>.
+import sys
+
 import pytest
 import numpy as np
 import pandas as pd
+from scipy.stats import genpareto, kstest
 
 from resourcecode.eva.censgaussfit import censgaussfit
-from resourcecode.eva.huseby import huseby
+from resourcecode.eva.huseby import huseby, _min_ratio
+from resourcecode.eva.simulation import run_simulation
 from resourcecode.eva.extrema import (
     get_fitted_models,
     get_gpd_parameters,
+    get_pot_extremes,
 )
+from pyextremes import EVA
 
 from . import DATA_DIR
 
@@ -86,6 +92,31 @@ def test_gpd_paramaters():
     # second and third column may be more different, but that should be ok
     assert gpg_parameters[:, 1:] == pytest.approx(expected_parameters[:, 1:], abs=1e-1)
 
+    assert get_gpd_parameters([]).shape == (0, 3)
+
+    # fitting the variables in parallel gives the same models
+    parallel_models = get_fitted_models(X, quant, max_workers=2)
+    assert (get_gpd_parameters(parallel_models) == gpg_parameters).all()
+
+
+def test_pot_extremes():
+    """the declustered extremes must be the same as the ones of pyextremes"""
+
+    X = pd.read_csv(
+        DATA_DIR / "censgaussfit" / "input_0.csv",
+        usecols=(1,),
+        delimiter=",",
+    ).iloc[:, 0]
+    X.index = pd.date_range("2021-01-01", periods=len(X), freq="h")
+    threshold = X.quantile(0.9)
+
+    for r in ("0", "6h", "72h"):
+        model = EVA(X)
+        model.get_extremes(method="POT", threshold=threshold, r=r)
+        pd.testing.assert_series_equal(
+            get_pot_extremes(model.data, threshold, r), model.extremes
+        )
+
 
 def test_nataf_acceptance():
     """this acceptance test assert that the output of the python function is
@@ -94,6 +125,77 @@ def test_nataf_acceptance():
     pytest.skip("How to test this, knowing it generates random values ?")
 
 
+def test_run_simulation():
+    gpd_parameters = np.array(
+        [
+            [1.523228, 0.9130694, 0.00566742],
+            [2.996940, 1.3203699, 0.24820895],
+        ]
+    )
+
+    simulations = run_simulation(
+        np.array([0.5]), 0.9, gpd_parameters, n_simulations=5000, random_state=42
+    )
+    assert simulations.shape == (5000, 2)
+    assert (simulations >= gpd_parameters[:, 0]).all()
+
+    # the chunks share the same generator: a given seed always gives the same
+    # simulations, whatever the number of chunks needed.
+    same_simulations = run_simulation(
+        np.array([0.5]), 0.9, gpd_parameters, n_simulations=5000, random_state=42
+    )
+    np.testing.assert_array_equal(simulations, same_simulations)
+
+    # numpy integers and generators are accepted as seeds
+    numpy_seed = run_simulation(
+        np.array([0.5]),
+        0.9,
+        gpd_parameters,
+        n_simulations=5000,
+        random_state=np.int64(42),
+    )
+    np.testing.assert_array_equal(simulations, numpy_seed)
+    generator = run_simulation(
+        np.array([0.5]),
+        0.9,
+        gpd_parameters,
+        n_simulations=5000,
+        random_state=np.random.default_rng(42),
+    )
+    np.testing.assert_array_equal(simulations, generator)
+
+    small_chunks = run_simulation(
+        np.array([0.5]),
+        0.9,
+        gpd_parameters,
+        n_simulations=5000,
+        chunk_size=1000,
+        random_state=42,
+    )
+    assert small_chunks.shape == (5000, 2)
+    assert np.isfinite(small_chunks).all()
+
+    # a single sample drawn at once
+    single_samples = run_simulation(
+        np.array([0.5]), 0.9, gpd_parameters, n_simulations=3, chunk_size=1
+    )
+    assert single_samples.shape == (3, 2)
+
+    # fully correlated variables
+    correlated = run_simulation(
+        np.array([1.0]), 0.9, gpd_parameters, n_simulations=100, random_state=0
+    )
+    assert np.isfinite(correlated).all()
+
+    # independent variables: the margins of the simulations are the GPDs
+    independent = run_simulation(
+        np.array([0.0]), 0.9, gpd_parameters, n_simulations=5000, random_state=0
+    )
+    for values, (loc, scale, c) in zip(independent.T, gpd_parameters):
+        margin = genpareto(loc=loc, scale=scale, c=c)
+        assert kstest(values, margin.cdf).pvalue > 0.01
+
+
 def test_huseby_acceptance_3D():
     """this acceptance test assert that the output of the python function is
     the same as the R function, for the same input.
@@ -164,3 +266,30 @@ def test_huseby_acceptance_2D():
     assert X == pytest.approx(X_expected)
     assert Y == pytest.approx(Y_expected)
     assert theta == pytest.approx(theta_expected)
+
+
+def test_min_ratio_by_blocks():
+    rng = np.random.default_rng(0)
+    C = rng.random((50, 3))
+    ps = rng.random((50, 50))
+    ps[ps < 0.1] = 0
+
+    with np.errstate(divide="ignore"):
+        expected = np.column_stack([(C[:, i] / ps).min(axis=1) for i in range(3)])
+        for block_size in (1, 70, 2**16):
+            assert np.array_equal(_min_ratio(C, ps, block_size), expected)
+
+
+def test_huseby_parallel_directional_quantiles(monkeypatch):
+    simulation = np.random.default_rng(0).standard_normal((1000, 3))
+    prob = np.array([0.9, 0.95, 0.975])
+
+    serial = huseby(simulation, prob, ntheta=40)
+    # the prange kernel is used when numba runs on more than two threads
+    # (resourcecode.eva.huseby is shadowed by the function in the package)
+    huseby_module = sys.modules["resourcecode.eva.huseby"]
+    monkeypatch.setattr(huseby_module, "get_num_threads", lambda: 4)
+    parallel = huseby(simulation, prob, ntheta=40)
+
+    for serial_values, parallel_values in zip(serial, parallel):
+        assert np.array_equal(serial_values, parallel_values)
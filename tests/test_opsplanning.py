@@ -181,6 +181,20 @@ def test_oplen_calc_critical_operation(data, criteria):
     assert (oplendetect_got.values == expected_operational_length_hours.values).all()
 
 
+@pytest.mark.parametrize("critical_operation", [False, True])
+def test_oplen_calc_index_unit(data, criteria, critical_operation):
+    critsubs = data.query(criteria)
+    critsubs_seconds = critsubs.set_axis(
+        critsubs.index.astype("datetime64[s]"), axis="index"
+    )
+    assert critsubs_seconds.index.dtype == "datetime64[s]"
+
+    expected = oplen_calc(critsubs, oplen=3, critical_operation=critical_operation)
+    got = oplen_calc(critsubs_seconds, oplen=3, critical_operation=critical_operation)
+
+    assert (got.values == expected.values).all()
+
+
 def test_olmonstats(data, criteria):
     critsubs = data.query(criteria)
     oplendetect = oplen_calc(critsubs, oplen=10)
@@ -17,11 +17,13 @@
 # You should have received a copy of the GNU General Public License along
 # with Resourcecode. If not, see <https://www.gnu.org/licenses/>.
 
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import pytest
 
 from resourcecode import producible_assessment
+from resourcecode.producible_assessment.main import _moment_weights, _trapezoid_weights
 from resourcecode.spectrum import compute_jonswap_wave_spectrum
 
 
@@ -47,3 +49,62 @@ def test_producible_assessment():
     assert pto.width == 20
     assert pto.wave_power[0][0] == pytest.approx(29315.1936)
     assert pto.wave_power[0][-1] == pytest.approx(431472.6246)
+
+    dataframe = pto.to_dataframe()
+    assert dataframe.index.equals(pto.times)
+    assert np.array_equal(dataframe["Wave power"], pto.wave_power[0])
+    assert np.array_equal(
+        dataframe["Mean power (with reduction factor)"], pto.mean_power[0]
+    )
+    assert np.array_equal(
+        dataframe["Median power (without reduction factor)"],
+        pto.median_power_no_red[0],
+    )
+    assert np.array_equal(
+        dataframe["PTO damping (with reduction factor)"], pto.pto_damp[0]
+    )
+
+
+def test_interp_freq():
+    capture_width = pd.DataFrame(
+        [[1.0, 2.0], [3.0, 6.0], [5.0, 4.0]],
+        index=[0.1, 0.2, 0.3],
+        columns=[1e5, 2e5],
+    )
+    wave_data = pd.DataFrame(
+        {"hs": [1.0, 2.0], "tp": [8.0, 10.0]},
+        index=pd.date_range("2021-01-01", periods=2, freq="h"),
+    )
+
+    # same frequencies: the capture width is used as is
+    spectrum = compute_jonswap_wave_spectrum(wave_data, capture_width.index)
+    pto = producible_assessment.PTO(capture_width, spectrum)
+    assert pto.capture_width is capture_width
+
+    # other frequencies: the capture width is interpolated on them
+    freqs = np.array([0.1, 0.15, 0.25, 0.3])
+    spectrum = compute_jonswap_wave_spectrum(wave_data, freqs)
+    pto = producible_assessment.PTO(capture_width, spectrum)
+    assert (pto.capture_width.index == freqs).all()
+    assert (pto.capture_width.columns == capture_width.columns).all()
+    np.testing.assert_allclose(
+        pto.capture_width.to_numpy(), [[1, 2], [2, 4], [4, 5], [5, 4]]
+    )
+    assert len(pto.power) == len(wave_data)
+
+
+def test_trapezoid_weights():
+    x = np.array([0.1, 0.15, 0.3, 0.32, 0.5])
+    y = np.random.default_rng(0).random((3, len(x)))
+    assert y @ _trapezoid_weights(x) == pytest.approx(np.trapz(y, x=x))
+
+
+def test_moment_weights():
+    f = np.array([0.1, 0.15, 0.3, 0.32, 0.5])
+    s = np.random.default_rng(0).random(len(f))
+
+    # same as integrating the spectrum interpolated on a regular grid
+    f0 = np.linspace(f[0], f[-1], 600)
+    for n in (-1, 0, 2):
+        expected = np.trapz(np.interp(f0, f, s) * f0**n, x=f0)
+        assert s @ _moment_weights(f, n) == pytest.approx(expected, rel=1e-12)
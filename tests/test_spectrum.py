@@ -18,6 +18,7 @@
 # with Resourcecode. If not, see <https://www.gnu.org/licenses/>.
 
 import numpy as np
+import pandas as pd
 import xarray
 import pytest
 
@@ -32,6 +33,7 @@ from resourcecode.spectrum import (
 )
 
 from resourcecode.spectrum.compute_parameters import SeaStatesParameters
+from resourcecode.spectrum.jonswap import compute_jonswap_wave_spectrum, jonswap
 
 from . import DATA_DIR
 
@@ -73,6 +75,25 @@ def test_compute_parameter_2D():
     assert got_parameters.approx(expected_parameters)
 
 
+def test_compute_jonswap_wave_spectrum():
+    freq = np.linspace(0.03, 0.5, 40)
+    seastate_data = pd.DataFrame(
+        {"hs": [1.0, 2.5, 4.0], "tp": [6.0, 9.0, 14.0]},
+        index=pd.date_range("2021-01-01", periods=3, freq="h"),
+    )
+
+    spectrum = compute_jonswap_wave_spectrum(seastate_data, freq, gamma=3.3)
+    assert spectrum.shape == (3, len(freq))
+    assert (spectrum.index == seastate_data.index).all()
+    assert (spectrum.columns == freq).all()
+
+    # each row is the spectrum of the corresponding sea state
+    for (_, row), (_, sea_state) in zip(spectrum.iterrows(), seastate_data.iterrows()):
+        expected = jonswap(sea_state.hs, sea_state.tp, gamma=3.3, freq=freq)
+        np.testing.assert_allclose(row, expected, rtol=1e-12)
+        assert 4 * np.sqrt(np.trapz(row, x=freq)) == pytest.approx(sea_state.hs)
+
+
 def test_download_2D_file():
     expected_spectrum = xarray.open_dataset(
         DATA_DIR / "spectrum" / "W001933N55743_201605.nc"